@@ -1,6 +1,5 @@
 import sys
 import os
-import importlib
 
 
 #Change the folder path to you folder location
@@ -14,6 +13,7 @@ sys.path.append(r"C:\Users\Pitinan\Documents\SIlpakorn Homework\2568\Applied Pro
 import BlendWeightHelperTool.blendWeightHelperUi as BlndWghtUi
 
 
+#Running this again reuses the open window. While editing the tool's code,
+#use BlndWghtUi.run(reload=True) to load your changes.
 
-importlib.reload(BlndWghtUi)
 BlndWghtUi.run()
\ No newline at end of file
@@ -0,0 +1,498 @@
+"""
+In-memory stand-in for maya.cmds / maya.mel / maya.api.OpenMaya(Anim) used by
+the benchmark suite. It models one polygon mesh bound to a skinCluster and a
+joint chain, and counts every call the tool makes into "Maya", so the
+benchmarks can report API round trips next to wall time.
+
+Only the calls blendWeightHelperUtil actually makes are implemented.
+"""
+import collections
+import importlib.util
+import itertools
+import os
+import re
+import sys
+import types
+from functools import wraps
+
+import numpy as np
+
+# ============================================================
+# SCENE
+# ============================================================
+class FakeScene(object):
+    """One skinned cylinder plus its joints; weights are kept as a dense float64 array."""
+    def __init__(self, mesh, points, face_counts, face_connects, joints, weights, skin_cluster="skinCluster1"):
+        self.mesh = mesh; self.shape = f"{mesh}Shape"; self.skin_cluster = skin_cluster
+        self.points = np.asarray(points, dtype=np.float64)
+        self.face_counts = np.asarray(face_counts, dtype=np.int64); self.face_connects = np.asarray(face_connects, dtype=np.int64)
+        face_start = np.repeat(np.cumsum(self.face_counts) - self.face_counts, self.face_counts)
+        corner = np.arange(len(self.face_connects))
+        next_corner = face_start + (corner - face_start + 1) % np.repeat(self.face_counts, self.face_counts)
+        self.edges = np.unique(np.sort(np.stack([self.face_connects, self.face_connects[next_corner]], axis=1), axis=1), axis=0)
+        self.joints = collections.OrderedDict(joints)  # full path -> world position
+        self.influences = list(self.joints)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.selection = []  # component tuples ("vtx"/"e", ids) or node full paths
+        self.paint_influence = None
+        self.color_sets = {}  # colour set name -> (N, 4) array
+        self.current_color_set = None; self.display_colors = False
+        self.calls = collections.Counter()
+
+    def count(self, name):
+        self.calls[name] += 1
+
+    def resolve(self, name):
+        """Full path of a node name (short, partial or long); None when unknown."""
+        name = str(name).split('.')[0]
+        for full in self.node_paths():
+            if full == name or full.endswith('|' + name.lstrip('|')) or full == name.lstrip('|'): return full
+        return None
+
+    def node_paths(self):
+        return [f"|{self.mesh}", f"|{self.mesh}|{self.shape}", self.skin_cluster] + list(self.joints)
+
+    def node_type(self, full):
+        if full == f"|{self.mesh}": return "transform"
+        if full == f"|{self.mesh}|{self.shape}": return "mesh"
+        if full == self.skin_cluster: return "skinCluster"
+        if full in self.joints: return "joint"
+        return None
+
+_scene = None
+
+def set_scene(scene):
+    global _scene
+    _scene = scene
+
+def get_scene():
+    return _scene
+
+def make_cylinder_scene(num_vertices, ring_size=64, extra_influences=16, mesh="body", spread_influences=False, skin_cluster="skinCluster1"):
+    """
+    Capped-free cylinder of about num_vertices vertices along +Y, skinned to a
+    four-joint chain j0 -> j1 -> j2 -> j3 plus unused extra influences. With
+    spread_influences=True every influence is used instead, each vertex
+    weighted to its four nearest influence centres like on a production rig.
+    """
+    rows = max(num_vertices // ring_size, 4)
+    angle = np.linspace(0.0, 2.0 * np.pi, ring_size, endpoint=False)
+    height = rows * 0.1
+    ring = np.stack([np.cos(angle), np.zeros(ring_size), np.sin(angle)], axis=1)
+    points = np.concatenate([ring + [0.0, row * 0.1, 0.0] for row in range(rows)])
+    r = np.arange(ring_size); faces = []
+    for row in range(rows - 1):
+        a = row * ring_size + r; b = row * ring_size + (r + 1) % ring_size
+        faces.append(np.stack([a, b, b + ring_size, a + ring_size], axis=1))
+    faces = np.concatenate(faces)
+    chain = ["|j0", "|j0|j1", "|j0|j1|j2", "|j0|j1|j2|j3"]
+    joints = [(path, [0.0, height * i / 3.0, 0.0]) for i, path in enumerate(chain)]
+    joints += [(f"|j0|extra{i}", [2.0, height * i / max(extra_influences, 1), 0.0]) for i in range(extra_influences)]
+    centres = np.array([pos[1] for _, pos in joints[:4]])
+    spread = np.exp(-((points[:, 1:2] - centres) / (height / 6.0)) ** 2)
+    spread[spread < 0.05] = 0.0
+    weights = np.zeros((len(points), len(joints)))
+    weights[:, :4] = spread / spread.sum(axis=1, keepdims=True)
+    if spread_influences:
+        # Every influence gets a centre on the surface and each vertex takes its four nearest.
+        centres = points[np.linspace(0, len(points) - 1, len(joints)).astype(np.int64)]
+        dist = np.stack([np.linalg.norm(points - centre, axis=1) for centre in centres], axis=1)
+        nearest = np.argpartition(dist, 4, axis=1)[:, :4]
+        near_weights = 1.0 / (np.take_along_axis(dist, nearest, axis=1) + 0.01)
+        weights[:] = 0.0
+        np.put_along_axis(weights, nearest, near_weights / near_weights.sum(axis=1, keepdims=True), axis=1)
+    scene = FakeScene(mesh, points, np.full(len(faces), 4), faces.ravel(), joints, weights, skin_cluster)
+    scene.paint_influence = "j2"
+    scene.ring_size = ring_size; scene.rows = rows
+    return scene
+
+_VTX_RE = re.compile(r"\.(vtx|e)\[(\d+)\]$")
+
+# ============================================================
+# maya.cmds
+# ============================================================
+def _counted(prefix):
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            _scene.count(f"{prefix}.{fn.__name__}")
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def _as_list(value):
+    if value is None: return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+def _short(full):
+    return full.split('|')[-1]
+
+cmds = types.ModuleType("maya.cmds")
+
+def _cmd(fn):
+    setattr(cmds, fn.__name__, _counted("cmds")(fn)); return fn
+
+@_cmd
+def ls(*args, **kwargs):
+    sl = kwargs.get("sl") or kwargs.get("selection"); long_names = kwargs.get("long") or kwargs.get("l")
+    node_type = kwargs.get("type"); objects_only = kwargs.get("objectsOnly")
+    items = []
+    if sl:
+        for item in _scene.selection:
+            if isinstance(item, tuple):
+                if objects_only: items.append(f"|{_scene.mesh}" if long_names else _scene.mesh); continue
+                kind, ids = item
+                items += [f"{_scene.mesh}.{kind}[{i}]" for i in ids]
+            else: items.append(item if long_names else _short(item))
+    else:
+        for name in itertools.chain.from_iterable(_as_list(a) for a in args):
+            if _VTX_RE.search(str(name)): items.append(name); continue
+            full = _scene.resolve(name)
+            if full: items.append(full if long_names else _short(full))
+    if node_type:
+        types_ = _as_list(node_type)
+        items = [i for i in items if not _VTX_RE.search(str(i)) and _scene.node_type(_scene.resolve(i)) in types_]
+    return items
+
+@_cmd
+def filterExpand(items, sm=None, **kwargs):
+    kind = {31: "vtx", 32: "e"}.get(sm)
+    found = [i for i in _as_list(items) if _VTX_RE.search(str(i)) and _VTX_RE.search(str(i)).group(1) == kind]
+    return found or None
+
+@_cmd
+def currentCtx(*args, **kwargs):
+    return "artAttrSkinContext"
+
+@_cmd
+def contextInfo(ctx, c=False, **kwargs):
+    return "artAttrSkin"
+
+@_cmd
+def artAttrSkinPaintCtx(ctx, q=False, influence=False, inf=False, **kwargs):
+    return _scene.paint_influence
+
+@_cmd
+def nodeType(node, **kwargs):
+    return "mesh" if _VTX_RE.search(str(node)) else _scene.node_type(_scene.resolve(node))
+
+@_cmd
+def listRelatives(node, p=False, c=False, ad=False, s=False, ni=False, f=False, type=None, **kwargs):
+    full = _scene.resolve(_as_list(node)[0])
+    if full is None: return None
+    paths = [path for path in _scene.node_paths() if path.startswith('|')]
+    if p: found = ['|'.join(full.split('|')[:-1])] if full.count('|') > 1 else []
+    elif ad: found = [path for path in paths if path.startswith(full + '|')]
+    else: found = [path for path in paths if path.startswith(full + '|') and path.count('|') == full.count('|') + 1]
+    if s: found = [path for path in found if _scene.node_type(path) == "mesh"]
+    if type: found = [path for path in found if _scene.node_type(path) in _as_list(type)]
+    if not found: return None
+    return found if f else [_short(path) for path in found]
+
+@_cmd
+def listConnections(node, type=None, **kwargs):
+    full = _scene.resolve(node)
+    if full in _scene.joints or full == f"|{_scene.mesh}|{_scene.shape}": return [_scene.skin_cluster]
+    return None
+
+@_cmd
+def listHistory(node, **kwargs):
+    return [_scene.resolve(node), _scene.skin_cluster]
+
+@_cmd
+def skinCluster(skin_cluster, q=False, e=False, g=False, geometry=False, inf=False, influence=False, **kwargs):
+    if q and (g or geometry): return [f"|{_scene.mesh}|{_scene.shape}"]
+    if q and (inf or influence): return [_short(path) for path in _scene.influences]
+    return None
+
+@_cmd
+def skinPercent(skin_cluster, components, q=False, value=False, tv=None, transformValue=None, normalize=True, **kwargs):
+    ids = [int(_VTX_RE.search(c).group(2)) for c in _as_list(components)]
+    if q: return list(_scene.weights[ids[0]])
+    for influence, weight in (tv or transformValue or []):
+        column = _scene.influences.index(_scene.resolve(influence))
+        _scene.weights[ids, column] = weight
+    if normalize:
+        rows = _scene.weights[ids]; _scene.weights[ids] = rows / np.maximum(rows.sum(axis=1, keepdims=True), 1e-12)
+
+@_cmd
+def xform(node, q=False, ws=False, t=False, **kwargs):
+    match = _VTX_RE.search(str(node))
+    if match: return list(_scene.points[int(match.group(2))])
+    return list(_scene.joints[_scene.resolve(node)])
+
+@_cmd
+def select(*args, **kwargs):
+    if kwargs.get("cl"): _scene.selection = []
+
+@_cmd
+def objExists(node, **kwargs):
+    return _scene.resolve(node) is not None
+
+@_cmd
+def getAttr(attr, **kwargs):
+    if attr.endswith(".displayColors"): return _scene.display_colors
+    raise ValueError(f"Unsupported attribute '{attr}'.")
+
+@_cmd
+def setAttr(attr, value, **kwargs):
+    if attr.endswith(".displayColors"): _scene.display_colors = bool(value); return
+    raise ValueError(f"Unsupported attribute '{attr}'.")
+
+@_cmd
+def polyColorSet(node, q=False, create=False, delete=False, currentColorSet=False, allColorSets=False, colorSet=None, **kwargs):
+    if q and allColorSets: return list(_scene.color_sets) or None
+    if q and currentColorSet: return [_scene.current_color_set] if _scene.current_color_set else None
+    if create: _scene.color_sets[colorSet] = np.zeros((len(_scene.points), 4))
+    if delete:
+        _scene.color_sets.pop(colorSet, None)
+        if _scene.current_color_set == colorSet: _scene.current_color_set = None
+    if currentColorSet and not q: _scene.current_color_set = colorSet
+
+_plugins = {}
+
+@_cmd
+def pluginInfo(name, q=False, loaded=False, **kwargs):
+    return os.path.abspath(name) in _plugins
+
+@_cmd
+def loadPlugin(path, quiet=False, **kwargs):
+    # Like Maya, import the plugin file under its bare module name.
+    module_name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec); spec.loader.exec_module(module)
+    module.initializePlugin(MObject())
+    _plugins[os.path.abspath(path)] = module
+
+def _no_op(name):
+    def command(*args, **kwargs):
+        return None
+    command.__name__ = name
+    return command
+
+for _name in ("warning", "inViewMessage", "refresh", "undoInfo", "undo", "window", "deleteUI", "progressBar", "columnLayout", "showWindow"):
+    _cmd(_no_op(_name))
+
+mel = types.ModuleType("maya.mel")
+mel.eval = _counted("mel")(lambda *args, **kwargs: None)
+
+# ============================================================
+# maya.api.OpenMaya
+# ============================================================
+class MFn(object):
+    kInvalid, kTransform, kMesh, kJoint, kSkinClusterFilter, kMeshVertComponent, kMeshEdgeComponent = range(7)
+
+class MSpace(object):
+    kWorld = 4; kObject = 2
+
+class MIntArray(list):
+    pass
+
+class MColorArray(list):
+    pass
+
+class MDoubleArray(list):
+    pass
+
+class MObject(object):
+    kNullObj = None
+    def __init__(self, api_type=MFn.kInvalid, name=None):
+        self._type = api_type; self.name = name
+    def isNull(self):
+        return self._type == MFn.kInvalid
+    def hasFn(self, api_type):
+        return self._type == api_type
+    def apiType(self):
+        return self._type
+
+class _Component(MObject):
+    def __init__(self, api_type):
+        super(_Component, self).__init__(api_type); self.elements = []
+
+def _node_object(full):
+    api_type = {"transform": MFn.kTransform, "mesh": MFn.kMesh, "joint": MFn.kJoint, "skinCluster": MFn.kSkinClusterFilter}[_scene.node_type(full)]
+    return MObject(api_type, full)
+
+class MDagPath(object):
+    def __init__(self, other=None):
+        self.path = other.path if isinstance(other, MDagPath) else other
+    def fullPathName(self):
+        return self.path
+    def partialPathName(self):
+        return _short(self.path)
+    def apiType(self):
+        return _node_object(self.path).apiType()
+    def hasFn(self, api_type):
+        return self.apiType() == api_type
+    def pop(self):
+        self.path = '|'.join(self.path.split('|')[:-1]); return self
+    def node(self):
+        return _node_object(self.path)
+
+def _api(fn):
+    @wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        _scene.count(f"om.{type(self).__name__}.{fn.__name__}")
+        return fn(self, *args, **kwargs)
+    return wrapper
+
+class MSelectionList(object):
+    @_api
+    def __init__(self):
+        self.items = []
+    @_api
+    def add(self, name):
+        full = _scene.resolve(name)
+        if full is None: raise RuntimeError(f"({name}) Object does not exist")
+        self.items.append((full, None))
+    def length(self):
+        return len(self.items)
+    @_api
+    def getDagPath(self, index):
+        return MDagPath(self.items[index][0])
+    @_api
+    def getDependNode(self, index):
+        return _node_object(self.items[index][0])
+    @_api
+    def getComponent(self, index):
+        full, comp = self.items[index]
+        if not full.startswith('|'): raise RuntimeError("Not a DAG node")
+        return MDagPath(full), comp if comp is not None else MObject()
+
+class MGlobal(object):
+    @staticmethod
+    def getActiveSelectionList():
+        _scene.count("om.MGlobal.getActiveSelectionList")
+        sel = MSelectionList()
+        for item in _scene.selection:
+            if isinstance(item, tuple):
+                kind, ids = item
+                comp = _Component(MFn.kMeshVertComponent if kind == "vtx" else MFn.kMeshEdgeComponent); comp.elements = list(ids)
+                sel.items.append((f"|{_scene.mesh}|{_scene.shape}", comp))
+            else: sel.items.append((item, None))
+        return sel
+
+class MFnSingleIndexedComponent(object):
+    def __init__(self, comp=None):
+        self.comp = comp
+    @_api
+    def create(self, api_type):
+        self.comp = _Component(api_type); return self.comp
+    @_api
+    def addElements(self, elements):
+        self.comp.elements.extend(int(e) for e in elements)
+    @_api
+    def getElements(self):
+        return MIntArray(self.comp.elements)
+
+class MFnMesh(object):
+    @_api
+    def __init__(self, dag):
+        self.dag = dag
+    @property
+    def numVertices(self):
+        return len(_scene.points)
+    @property
+    def numPolygons(self):
+        return len(_scene.face_counts)
+    @_api
+    def getPoints(self, space=MSpace.kObject):
+        # Returned as an (N, 4) array; np.array() on a real MPointArray gives the same shape.
+        return np.hstack([_scene.points, np.ones((len(_scene.points), 1))])
+    @_api
+    def getVertices(self):
+        return MIntArray(_scene.face_counts.tolist()), MIntArray(_scene.face_connects.tolist())
+    @_api
+    def getEdgeVertices(self, edge):
+        return tuple(int(v) for v in _scene.edges[edge])
+    @_api
+    def setVertexColors(self, colors, vertex_ids):
+        _scene.color_sets[_scene.current_color_set][list(vertex_ids)] = np.asarray(colors, dtype=np.float64)
+
+class MPxCommand(object):
+    def __init__(self):
+        pass
+
+class MFnPlugin(object):
+    def __init__(self, obj, vendor=None, version=None):
+        pass
+    def registerCommand(self, name, creator):
+        def run(*args, **kwargs):
+            command = creator(); command.doIt(args)
+        run.__name__ = name
+        setattr(cmds, name, _counted("cmds")(run))
+    def deregisterCommand(self, name):
+        delattr(cmds, name)
+
+_callback_ids = itertools.count(1)
+callbacks = {}
+
+def _add_callback(kind):
+    def add(*args):
+        callback_id = next(_callback_ids); callbacks[callback_id] = (kind, args); return callback_id
+    return staticmethod(add)
+
+class MMessage(object):
+    @staticmethod
+    def removeCallback(callback_id):
+        callbacks.pop(callback_id, None)
+
+class MEventMessage(MMessage):
+    addEventCallback = _add_callback("event")
+
+class MDGMessage(MMessage):
+    addNodeAddedCallback = _add_callback("nodeAdded")
+    addNodeRemovedCallback = _add_callback("nodeRemoved")
+    addConnectionCallback = _add_callback("connection")
+
+class MNodeMessage(MMessage):
+    addNameChangedCallback = _add_callback("nameChanged")
+
+class MPolyMessage(MMessage):
+    addPolyTopologyChangedCallback = _add_callback("topologyChanged")
+
+class MPoint(object):
+    def __init__(self, *args):
+        values = list(args[0]) if len(args) == 1 else list(args)
+        self.x, self.y, self.z = (values + [0.0, 0.0, 0.0])[:3]
+
+MVector = MPoint
+
+OpenMaya = types.ModuleType("maya.api.OpenMaya")
+for _name, _value in list(globals().items()):
+    if _name.startswith("M") and isinstance(_value, type): setattr(OpenMaya, _name, _value)
+
+# ============================================================
+# maya.api.OpenMayaAnim
+# ============================================================
+class MFnSkinCluster(object):
+    @_api
+    def __init__(self, obj):
+        self.name = obj.name
+    @_api
+    def influenceObjects(self):
+        return [MDagPath(path) for path in _scene.influences]
+    @_api
+    def getWeights(self, dag, comp):
+        block = _scene.weights[comp.elements]
+        return MDoubleArray(block.ravel().tolist()), block.shape[1]
+    @_api
+    def setWeights(self, dag, comp, influences, values, normalize=True, returnOldWeights=False):
+        rows = np.asarray(comp.elements, dtype=np.int64); columns = np.asarray(influences, dtype=np.int64)
+        old = _scene.weights[np.ix_(rows, columns)].ravel().tolist()
+        _scene.weights[np.ix_(rows, columns)] = np.asarray(values, dtype=np.float64).reshape(len(rows), len(columns))
+        return MDoubleArray(old) if returnOldWeights else None
+
+OpenMayaAnim = types.ModuleType("maya.api.OpenMayaAnim")
+OpenMayaAnim.MFnSkinCluster = MFnSkinCluster
+
+# ============================================================
+# INSTALL
+# ============================================================
+def install():
+    """Registers the fake maya modules in sys.modules (call before importing the tool)."""
+    maya = types.ModuleType("maya"); api = types.ModuleType("maya.api")
+    maya.cmds = cmds; maya.mel = mel; maya.api = api
+    api.OpenMaya = OpenMaya; api.OpenMayaAnim = OpenMayaAnim
+    sys.modules.update({"maya": maya, "maya.cmds": cmds, "maya.mel": mel, "maya.api": api,
+                        "maya.api.OpenMaya": OpenMaya, "maya.api.OpenMayaAnim": OpenMayaAnim})
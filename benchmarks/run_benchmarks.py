@@ -0,0 +1,141 @@
+"""
+Headless benchmarks for the weight operations in blendWeightHelperUtil.
+
+Runs the tool against the in-memory maya stand-in from fake_maya.py on synthetic
+skinned cylinders and reports, per operation and mesh size, wall time, the
+number of calls made into maya.cmds / OpenMaya and peak Python memory.
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 --repeat 5 --json bench.json
+"""
+import argparse
+import importlib
+import importlib.util
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import fake_maya
+
+PACKAGE_NAME = "BlendWeightHelperTool"
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+def load_package():
+    """Imports the tool as a package, whatever the repo folder is called; the Maya-free modules need nothing else."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if PACKAGE_NAME not in sys.modules:
+        spec = importlib.util.spec_from_file_location(PACKAGE_NAME, os.path.join(root, "__init__.py"), submodule_search_locations=[root])
+        package = importlib.util.module_from_spec(spec); sys.modules[PACKAGE_NAME] = package; spec.loader.exec_module(package)
+    return sys.modules[PACKAGE_NAME]
+
+def load_util():
+    """The util module on top of the fake maya."""
+    fake_maya.install()
+    load_package()
+    return importlib.import_module(f"{PACKAGE_NAME}.blendWeightHelperUtil")
+
+# Each operation prepares the scene (selection, paint influence) and returns the call to time.
+def op_capsule(util, scene):
+    scene.selection = [("vtx", range(len(scene.points)))]
+    return lambda: util.apply_localized_capsule_blend(1.5, 1.0)
+
+def op_capsule_preview(util, scene):
+    scene.selection = [("vtx", range(len(scene.points)))]
+    preview = util.CapsulePreview(); preview.start()
+    falloffs = iter(np.tile(np.linspace(0.5, 2.0, 16), 1000))
+    return lambda: preview.update(1.5, next(falloffs))
+
+def op_simple_blend(util, scene):
+    center_row = scene.rows // 2
+    scene.selection = [("vtx", range(center_row * scene.ring_size, (center_row + 1) * scene.ring_size))]
+    return lambda: util.apply_simple_blend()
+
+def op_smooth(util, scene):
+    scene.selection = [("vtx", range(len(scene.points)))]
+    return lambda: util.apply_smooth_weights(5, 0.5)
+
+def op_influence_limits(util, scene):
+    scene.selection = []
+    return lambda: util.enforce_influence_limits(2, 0.01, mesh=scene.mesh)
+
+def op_read_weights(util, scene):
+    scene.selection = [("vtx", range(len(scene.points)))]
+    return lambda: list(util.get_vertex_weights_all())
+
+def op_batch_write(util, scene):
+    scene.selection = []
+    weight_data = [(f"{scene.mesh}.vtx[{i}]", "j2", 0.5) for i in range(len(scene.points))]
+    return lambda: util.set_multiple_vertex_weights(weight_data)
+
+OPERATIONS = {
+    "apply_localized_capsule_blend": op_capsule,
+    "CapsulePreview.update": op_capsule_preview,
+    "apply_simple_blend": op_simple_blend,
+    "apply_smooth_weights": op_smooth,
+    "apply_smooth_weights (150 inf)": op_smooth,
+    "enforce_influence_limits": op_influence_limits,
+    "get_vertex_weights_all": op_read_weights,
+    "set_multiple_vertex_weights": op_batch_write,
+}
+
+# Scene overrides per operation. The 150-influence rig (four weights per vertex) gets its
+# own mesh and skinCluster so the cached tables of the default scene stay valid.
+SCENE_OPTIONS = {
+    "apply_smooth_weights (150 inf)": lambda size: {"mesh": f"rig{size}", "skin_cluster": f"rigSkin{size}",
+                                                    "extra_influences": 146, "spread_influences": True},
+}
+
+def run_operation(util, name, size, repeat):
+    options = SCENE_OPTIONS[name](size) if name in SCENE_OPTIONS else {"mesh": f"body{size}"}
+    scene = fake_maya.make_cylinder_scene(size, **options)
+    fake_maya.set_scene(scene)
+    call = OPERATIONS[name](util, scene)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter(); call(); times.append(time.perf_counter() - start)
+    # Counts and memory come from one extra run so tracing does not skew the timings.
+    scene.calls.clear()
+    tracemalloc.start()
+    try: call(); peak = tracemalloc.get_traced_memory()[1]
+    finally: tracemalloc.stop()
+    calls = dict(scene.calls)
+    return {
+        "operation": name, "vertices": len(scene.points),
+        "first_s": times[0], "best_s": min(times),
+        "maya_calls": sum(count for key, count in calls.items() if key != "cmds.warning"),
+        "warnings": calls.get("cmds.warning", 0),
+        "peak_mb": peak / (1024.0 * 1024.0),
+        "calls": calls,
+    }
+
+def format_table(results):
+    header = f"{'operation':<32}{'verts':>9}{'first s':>10}{'best s':>10}{'calls':>9}{'warn':>6}{'peak MB':>10}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(f"{r['operation']:<32}{r['vertices']:>9}{r['first_s']:>10.4f}{r['best_s']:>10.4f}{r['maya_calls']:>9}{r['warnings']:>6}{r['peak_mb']:>10.1f}")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="vertex counts of the synthetic meshes")
+    parser.add_argument("--ops", nargs="+", choices=sorted(OPERATIONS), default=list(OPERATIONS), help="operations to run")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per operation and size")
+    parser.add_argument("--json", help="also write the full results, including per-call counts, to this file")
+    args = parser.parse_args(argv)
+    util = load_util()
+    results = []
+    for size in args.sizes:
+        for name in args.ops:
+            results.append(run_operation(util, name, size, max(args.repeat, 1)))
+            print(format_table(results[-1:]).splitlines()[-1] if len(results) > 1 else format_table(results), flush=True)
+    if args.json:
+        with open(args.json, "w") as f: json.dump(results, f, indent=2)
+    return results
+
+if __name__ == "__main__":
+    main()
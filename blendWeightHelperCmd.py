@@ -0,0 +1,103 @@
+"""
+Undoable bulk skinCluster weight write.
+This file is loaded as a Maya plugin by blendWeightHelperUtil; the tool queues a
+weight block with queue_weights() and then runs the blendWeightHelperSetWeights
+command, which commits it with MFnSkinCluster.setWeights in large chunks and
+keeps the old weights so undo/redo restore it as a single step.
+"""
+import sys
+import types
+
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
+
+COMMAND_NAME = "blendWeightHelperSetWeights"
+_QUEUE_MODULE = "_blendWeightHelperPendingWeights"
+
+def maya_useNewAPI():
+    pass
+
+def _pending():
+    # Maya imports a plugin file under its bare module name while the tool imports it
+    # through the package, so both copies share the queue through sys.modules.
+    queue = sys.modules.get(_QUEUE_MODULE)
+    if queue is None:
+        queue = types.ModuleType(_QUEUE_MODULE); queue.items = []
+        sys.modules[_QUEUE_MODULE] = queue
+    return queue.items
+
+def queue_weights(skin_cluster, geometry, vertex_ids, influence_indices, weights, chunk_size=None, progress=None):
+    """
+    Queues a dense (len(vertex_ids), len(influence_indices)) block, flattened row
+    by row, for the next command call. The block is written chunk_size vertices
+    at a time; progress(done, total) runs after each chunk and returning False
+    cancels the run and restores the weights from before it. The returned dict
+    has "cancelled" set once the command has run.
+    """
+    payload = {"skin_cluster": skin_cluster, "geometry": geometry, "vertex_ids": [int(i) for i in vertex_ids],
+               "influence_indices": [int(i) for i in influence_indices], "weights": weights,
+               "chunk_size": chunk_size, "progress": progress, "cancelled": False}
+    _pending().append(payload)
+    return payload
+
+def discard_weights(payload):
+    """Drops a queued payload the command never picked up, so a later call cannot commit it."""
+    items = _pending()
+    items[:] = [item for item in items if item is not payload]
+
+class SetWeightsCommand(om.MPxCommand):
+    def __init__(self):
+        super(SetWeightsCommand, self).__init__()
+        self.payload = None; self.old_weights = []
+
+    @staticmethod
+    def creator():
+        return SetWeightsCommand()
+
+    def doIt(self, args):
+        if not _pending(): raise RuntimeError(f"{COMMAND_NAME}: no weights were queued.")
+        self.payload = _pending().pop(0)
+        # The progress callback belongs to the UI run; redo after undo writes silently.
+        progress = self.payload.pop("progress")
+        self._write(progress)
+
+    def _targets(self):
+        sel = om.MSelectionList(); sel.add(self.payload["skin_cluster"]); sel.add(self.payload["geometry"])
+        return oma.MFnSkinCluster(sel.getDependNode(0)), sel.getDagPath(1), om.MIntArray(self.payload["influence_indices"])
+
+    def _write(self, progress=None):
+        fn_skin, dag, influences = self._targets()
+        vertex_ids = self.payload["vertex_ids"]; weights = self.payload["weights"]
+        total = len(vertex_ids); chunk_size = self.payload["chunk_size"] or max(total, 1); width = len(influences)
+        self.old_weights = []
+        try:
+            for start in range(0, total, chunk_size):
+                stop = min(start + chunk_size, total)
+                fn_comp = om.MFnSingleIndexedComponent(); comp = fn_comp.create(om.MFn.kMeshVertComponent); fn_comp.addElements(vertex_ids[start:stop])
+                old = fn_skin.setWeights(dag, comp, influences, om.MDoubleArray(weights[start * width:stop * width]), False, True)
+                self.old_weights.append((comp, old))
+                if progress is not None and progress(stop, total) is False:
+                    self._restore(); self.payload["cancelled"] = True; return
+        except Exception:
+            # A failed command never reaches the undo queue, so roll the written batches back here.
+            self._restore(); raise
+
+    def _restore(self):
+        fn_skin, dag, influences = self._targets()
+        for comp, old in reversed(self.old_weights): fn_skin.setWeights(dag, comp, influences, old, False)
+        self.old_weights = []
+
+    def redoIt(self):
+        self._write()
+
+    def undoIt(self):
+        self._restore()
+
+    def isUndoable(self):
+        return not self.payload["cancelled"]
+
+def initializePlugin(plugin):
+    om.MFnPlugin(plugin, "SecretP", "1.0").registerCommand(COMMAND_NAME, SetWeightsCommand.creator)
+
+def uninitializePlugin(plugin):
+    om.MFnPlugin(plugin).deregisterCommand(COMMAND_NAME)
@@ -0,0 +1,92 @@
+"""
+Compact binary weight snapshots (.bwh).
+Pure Python/NumPy like blendWeightHelperKernel: a file holds one SparseWeights
+matrix and every array sits at a 16-byte aligned offset, so the file can be
+memory-mapped and only the rows that are needed get read.
+
+Layout (little endian):
+    header    MAGIC, version, value dtype code, mesh vertex count, row count,
+              entry count, byte length of the name block
+    names     utf-8, newline separated: mesh name, then the influence names
+    vertex_ids int32[rows]
+    indptr     int64[rows + 1]
+    indices    int32[entries]
+    values     float32 or float16[entries]
+"""
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+from . import blendWeightHelperKernel as BlndWghtKernel
+
+MAGIC = b"BWHW"
+VERSION = 1
+FILE_EXTENSION = ".bwh"
+_HEADER = struct.Struct("<4sHHqqqq")
+_ALIGN = 16
+_VALUE_DTYPES = {0: np.dtype("<f4"), 1: np.dtype("<f2")}
+_DTYPE_CODES = {"float32": 0, "float16": 1}
+
+WeightFileHeader = namedtuple("WeightFileHeader", "version dtype num_vertices num_rows nnz mesh influence_names offsets")
+
+def _aligned(offset):
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+def _layout(names_offset, names_len, num_rows, nnz, value_dtype):
+    offsets = {}; offset = _aligned(names_offset + names_len)
+    for name, dtype, count in (("vertex_ids", np.dtype("<i4"), num_rows), ("indptr", np.dtype("<i8"), num_rows + 1),
+                               ("indices", np.dtype("<i4"), nnz), ("values", value_dtype, nnz)):
+        offsets[name] = (offset, dtype, count)
+        offset = _aligned(offset + dtype.itemsize * count)
+    return offsets
+
+def write_weights(path, weights, num_vertices, dtype="float32"):
+    """Writes a SparseWeights matrix of a mesh with num_vertices vertices."""
+    if dtype not in _DTYPE_CODES: raise ValueError(f"Unsupported weight dtype '{dtype}', use one of {sorted(_DTYPE_CODES)}.")
+    code = _DTYPE_CODES[dtype]
+    names = "\n".join([weights.mesh or ""] + list(weights.influence_names)).encode("utf-8")
+    num_rows, nnz = len(weights.vertex_ids), weights.nnz
+    offsets = _layout(_HEADER.size, len(names), num_rows, nnz, _VALUE_DTYPES[code])
+    arrays = {"vertex_ids": weights.vertex_ids, "indptr": weights.indptr, "indices": weights.indices, "values": weights.values}
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, code, int(num_vertices), num_rows, nnz, len(names)))
+        f.write(names)
+        for name, (offset, array_dtype, count) in offsets.items():
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(np.ascontiguousarray(arrays[name], dtype=array_dtype).tobytes())
+
+def read_header(path):
+    with open(path, "rb") as f:
+        raw = f.read(_HEADER.size)
+        if len(raw) < _HEADER.size: raise ValueError(f"'{path}' is not a weight snapshot.")
+        magic, version, code, num_vertices, num_rows, nnz, names_len = _HEADER.unpack(raw)
+        if magic != MAGIC: raise ValueError(f"'{path}' is not a weight snapshot.")
+        if version > VERSION or code not in _VALUE_DTYPES: raise ValueError(f"'{path}' was written by a newer version of this tool.")
+        names = f.read(names_len).decode("utf-8").split("\n")
+    offsets = _layout(_HEADER.size, names_len, num_rows, nnz, _VALUE_DTYPES[code])
+    return WeightFileHeader(version, _VALUE_DTYPES[code], num_vertices, num_rows, nnz, names[0], names[1:], offsets)
+
+class WeightFile(object):
+    """Memory-mapped snapshot; arrays are only paged in for the rows that are read."""
+    def __init__(self, path):
+        self.path = path
+        self.header = read_header(path)
+        self.arrays = {}
+        for name, (offset, dtype, count) in self.header.offsets.items():
+            self.arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(count,)) if count else np.zeros(0, dtype=dtype)
+
+    def __len__(self):
+        return self.header.num_rows
+
+    def read(self, start=0, stop=None, dtype=np.float64):
+        """SparseWeights for rows start..stop, with values converted to dtype."""
+        stop = self.header.num_rows if stop is None else min(stop, self.header.num_rows)
+        indptr = np.array(self.arrays["indptr"][start:stop + 1], dtype=np.int64)
+        lo, hi = (int(indptr[0]), int(indptr[-1])) if len(indptr) else (0, 0)
+        return BlndWghtKernel.SparseWeights(self.header.mesh, np.array(self.arrays["vertex_ids"][start:stop], dtype=np.int64), indptr - lo,
+                                            np.array(self.arrays["indices"][lo:hi]), np.array(self.arrays["values"][lo:hi], dtype=dtype), self.header.influence_names)
+
+    def iter_chunks(self, chunk_size):
+        for start in range(0, self.header.num_rows, chunk_size):
+            yield self.read(start, start + chunk_size)
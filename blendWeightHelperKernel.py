@@ -0,0 +1,371 @@
+"""
+Pure NumPy kernels used by blendWeightHelperUtil (SciPy only speeds up the
+smoothing when it is installed).
+Nothing in here may import maya, so the maths can be checked outside Maya.
+"""
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+_sparse = None
+# Without SciPy, smooth on the non-zero weights once fewer than 1 in this many block entries are set.
+SPARSE_SMOOTH_RATIO = 4
+
+def _scipy_sparse():
+    # scipy.sparse is optional and slow to import, so look for it on first use.
+    global _sparse
+    if _sparse is None:
+        try: from scipy import sparse as _sparse
+        except ImportError: _sparse = False
+    return _sparse
+
+def segment_distances(points, seg_start, seg_end):
+    """
+    Distance from every row of an (N,3) point array to the segment
+    seg_start -> seg_end (the closest point is clamped to the segment).
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    seg_start = np.asarray(seg_start, dtype=np.float64)[:3]
+    seg_end = np.asarray(seg_end, dtype=np.float64)[:3]
+    segment_vec = seg_end - seg_start
+    point_vec = points - seg_start
+    segment_len_sq = float(segment_vec @ segment_vec)
+    if segment_len_sq == 0: return np.linalg.norm(point_vec, axis=1)
+    t = np.clip((point_vec @ segment_vec) / segment_len_sq, 0.0, 1.0)
+    closest = seg_start + t[:, None] * segment_vec
+    return np.linalg.norm(points - closest, axis=1)
+
+def capsule_distances(points, parent_pos, child_pos, grandchild_pos):
+    """Distances to the parent bone (parent -> child) and child bone (child -> grandchild)."""
+    return segment_distances(points, parent_pos, child_pos), segment_distances(points, child_pos, grandchild_pos)
+
+def capsule_weights_from_distances(dist_parent, dist_child, radius, falloff):
+    """
+    Maps bone distances to (parent_weights, child_weights, valid_mask).
+    Mirrors the per-vertex rules of apply_localized_capsule_blend: inside both
+    capsules the weights follow pow(ratio, falloff), inside one capsule that bone
+    gets 1.0, and vertices outside both (or sitting on the joint) are not valid.
+    """
+    dist_parent = np.asarray(dist_parent, dtype=np.float64)
+    dist_child = np.asarray(dist_child, dtype=np.float64)
+    in_parent = dist_parent < radius; in_child = dist_child < radius
+    both = in_parent & in_child
+    total_dist = dist_parent + dist_child
+    blend = both & (total_dist > 0.001)
+    child_w = np.zeros(dist_parent.shape, dtype=np.float64)
+    ratio = np.divide(dist_parent, total_dist, out=np.zeros_like(child_w), where=blend)
+    child_w[blend] = np.power(ratio[blend], falloff)
+    child_w[in_child & ~in_parent] = 1.0
+    valid = blend | (in_parent ^ in_child)
+    parent_w = np.where(valid, 1.0 - child_w, 0.0)
+    child_w[~valid] = 0.0
+    return parent_w, child_w, valid
+
+def capsule_blend_weights(points, parent_pos, child_pos, grandchild_pos, radius, falloff):
+    """One-call capsule solve for an (N,3) position array."""
+    dist_parent, dist_child = capsule_distances(points, parent_pos, child_pos, grandchild_pos)
+    return capsule_weights_from_distances(dist_parent, dist_child, radius, falloff)
+
+def normalize_weight_block(block, locked=None):
+    """
+    Clamps an (N, influences) weight block to 0..1 and makes every row sum to 1.
+    Entries flagged in `locked` keep their value and the remaining influences are
+    rescaled to fill what is left, like skinPercent(normalize=True). Rows that
+    cannot honour that (nothing left to rescale, or locked values over 1.0) fall
+    back to a plain division by the row sum.
+    """
+    block = np.clip(np.asarray(block, dtype=np.float64), 0.0, 1.0)
+    if locked is None: locked = np.zeros(block.shape, dtype=bool)
+    locked_sum = np.where(locked, block, 0.0).sum(axis=1)
+    free_sum = block.sum(axis=1) - locked_sum
+    rescale = (free_sum > 1e-8) & (locked_sum <= 1.0)
+    scale = np.divide(1.0 - locked_sum, free_sum, out=np.ones_like(free_sum), where=rescale)
+    block = np.where(locked | ~rescale[:, None], block, block * scale[:, None])
+    row_sum = block.sum(axis=1)
+    plain = ~rescale & (row_sum > 1e-8)
+    block[plain] /= row_sum[plain, None]
+    return block
+
+def apply_weight_edits(block, rows, columns, values, keep_columns=None, normalize=True):
+    """
+    Writes (row, column, value) edits into a copy of `block`. When keep_columns
+    is given every other influence of the edited rows is pruned to 0.0 first.
+    """
+    block = np.array(block, dtype=np.float64, copy=True)
+    rows = np.asarray(rows, dtype=np.int64); columns = np.asarray(columns, dtype=np.int64)
+    if keep_columns is not None:
+        prune = np.ones(block.shape[1], dtype=bool); prune[np.asarray(keep_columns, dtype=np.int64)] = False
+        block[np.ix_(np.unique(rows), np.flatnonzero(prune))] = 0.0
+    block[rows, columns] = np.clip(np.asarray(values, dtype=np.float64), 0.0, 1.0)
+    if not normalize: return block
+    locked = np.zeros(block.shape, dtype=bool); locked[rows, columns] = True
+    return normalize_weight_block(block, locked)
+
+def prune_weight_block(block, max_influences=None, min_weight=0.0):
+    """
+    Keeps the max_influences largest weights of every row (argpartition top-k),
+    drops weights below min_weight and renormalizes the rows that lost anything.
+    A row never loses its largest weight. Returns (block, changed row mask).
+    """
+    block = np.asarray(block, dtype=np.float64)
+    keep = (block > 0.0) & (block >= min_weight)
+    if max_influences and max_influences < block.shape[1]:
+        top = np.argpartition(block, block.shape[1] - max_influences, axis=1)[:, -max_influences:]
+        in_top = np.zeros(block.shape, dtype=bool); np.put_along_axis(in_top, top, True, axis=1)
+        keep &= in_top
+    rows = np.arange(len(block)); largest = block.argmax(axis=1)
+    keep[rows, largest] |= block[rows, largest] > 0.0
+    changed = ((block > 0.0) & ~keep).any(axis=1)
+    pruned = np.where(keep, block, 0.0)
+    pruned[changed] = normalize_weight_block(pruned[changed])
+    return pruned, changed
+
+def _neighbour_average(indptr, indices, num_rows):
+    # Row-normalized adjacency as a block -> neighbour mean callable; SciPy when
+    # available, otherwise a reduceat over the gathered neighbour rows.
+    counts = np.diff(indptr); inverse = 1.0 / np.maximum(counts, 1)
+    sparse = _scipy_sparse()
+    if sparse:
+        matrix = sparse.csr_matrix((np.repeat(inverse, counts), indices, indptr), shape=(len(counts), num_rows))
+        return lambda block: matrix @ block
+    nonempty = counts > 0; starts = indptr[:-1][nonempty]
+    def average(block):
+        result = np.zeros((len(counts), block.shape[1]), dtype=np.float64)
+        if len(starts): result[nonempty] = np.add.reduceat(block[indices], starts, axis=0) * inverse[nonempty, None]
+        return result
+    return average
+
+def _smooth_nonzero(block, free_rows, indptr, indices, iterations, strength):
+    # SciPy-free Jacobi iterations on the non-zero (free row, column, value)
+    # entries, so the cost follows the weights each vertex actually carries
+    # instead of region x influences. Returns the smoothed free rows, dense.
+    num_cols = block.shape[1]
+    counts = np.diff(indptr); alpha = np.where(counts > 0, float(strength), 0.0)
+    share = alpha / np.maximum(counts, 1); owner = np.repeat(np.arange(len(free_rows)), counts)
+    is_free = np.zeros(len(block), dtype=bool); is_free[free_rows] = True
+    fixed_rows, fixed_cols = np.nonzero(block); fixed = ~is_free[fixed_rows]
+    fixed_rows = fixed_rows[fixed]; fixed_cols = fixed_cols[fixed]; fixed_vals = block[fixed_rows, fixed_cols]
+    free_idx, free_cols = np.nonzero(block[free_rows]); free_vals = block[free_rows[free_idx], free_cols]
+    for _ in range(iterations):
+        entry_rows = np.concatenate([fixed_rows, free_rows[free_idx]])
+        entry_cols = np.concatenate([fixed_cols, free_cols]); entry_vals = np.concatenate([fixed_vals, free_vals])
+        order = np.argsort(entry_rows, kind="stable")
+        row_nnz = np.bincount(entry_rows, minlength=len(block)); row_start = np.cumsum(row_nnz) - row_nnz
+        # Gather the entries of every neighbour row, tagged with the free row they feed.
+        gathered = row_nnz[indices]; offset = np.cumsum(gathered) - gathered
+        src = order[np.repeat(row_start[indices] - offset, gathered) + np.arange(gathered.sum())]
+        owners = np.repeat(owner, gathered)
+        keys = np.concatenate([free_idx, owners]) * num_cols + np.concatenate([free_cols, entry_cols[src]])
+        values = np.concatenate([(1.0 - alpha[free_idx]) * free_vals, share[owners] * entry_vals[src]])
+        keys, inverse = np.unique(keys, return_inverse=True)
+        free_vals = np.bincount(inverse, weights=values, minlength=len(keys)); free_idx, free_cols = np.divmod(keys, num_cols)
+    result = np.zeros((len(free_rows), num_cols), dtype=np.float64)
+    result[free_idx, free_cols] = free_vals
+    return result
+
+def smooth_weight_block(block, free_rows, indptr, indices, iterations=5, strength=0.5):
+    """
+    Laplacian smoothing of the `free_rows` of an (N, influences) block. Each
+    Jacobi iteration moves every free row `strength` of the way to the mean of
+    its neighbour rows, listed per free row as block rows in the CSR pair
+    indptr/indices. The other rows stay locked and act as the boundary.
+    Without SciPy, blocks that are mostly zeros (many influences, a few weights
+    per vertex) iterate on their non-zero weights only, so the cost does not
+    grow with the influence count; denser blocks gather whole neighbour rows.
+    """
+    block = np.array(block, dtype=np.float64, copy=True)
+    free_rows = np.asarray(free_rows, dtype=np.int64)
+    indptr = np.asarray(indptr, dtype=np.int64); indices = np.asarray(indices, dtype=np.int64)
+    if not _scipy_sparse() and np.count_nonzero(block) * SPARSE_SMOOTH_RATIO < block.size:
+        block[free_rows] = _smooth_nonzero(block, free_rows, indptr, indices, iterations, strength)
+    else:
+        average = _neighbour_average(indptr, indices, len(block))
+        alpha = np.where(np.diff(indptr) > 0, float(strength), 0.0)[:, None]
+        for _ in range(iterations):
+            block[free_rows] = (1.0 - alpha) * block[free_rows] + alpha * average(block)
+    block[free_rows] = normalize_weight_block(block[free_rows])
+    return block
+
+class SparseWeights(object):
+    """
+    CSR weight matrix for a set of vertices of one mesh: row r holds vertex
+    vertex_ids[r], its influence columns are indices[indptr[r]:indptr[r+1]] and
+    the weights are the matching slice of values.
+    """
+    def __init__(self, mesh, vertex_ids, indptr, indices, values, influence_names):
+        self.mesh = mesh
+        self.vertex_ids = np.asarray(vertex_ids, dtype=np.int64)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.values = np.asarray(values)
+        self.influence_names = list(influence_names)
+
+    @classmethod
+    def from_dense(cls, mesh, vertex_ids, block, influence_names, threshold=0.0001):
+        """Keeps the entries of an (N, influences) block that are above threshold."""
+        block = np.asarray(block)
+        rows, columns = np.nonzero(block > threshold)
+        indptr = np.zeros(len(block) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(block)), out=indptr[1:])
+        return cls(mesh, vertex_ids, indptr, columns, block[rows, columns], influence_names)
+
+    @classmethod
+    def concatenate(cls, parts):
+        """Stacks chunks of the same mesh and influence table row-wise."""
+        parts = list(parts)
+        offsets = np.cumsum([0] + [part.indptr[-1] for part in parts[:-1]])
+        indptr = np.concatenate([[0]] + [part.indptr[1:] + offset for part, offset in zip(parts, offsets)])
+        return cls(parts[0].mesh, np.concatenate([part.vertex_ids for part in parts]), indptr,
+                   np.concatenate([part.indices for part in parts]), np.concatenate([part.values for part in parts]), parts[0].influence_names)
+
+    @property
+    def nnz(self):
+        return int(self.indptr[-1])
+
+    def __len__(self):
+        return len(self.vertex_ids)
+
+    def entry_rows(self):
+        """Row number of every stored entry."""
+        return np.repeat(np.arange(len(self.vertex_ids)), np.diff(self.indptr))
+
+    def to_dense(self, num_influences=None):
+        if num_influences is None: num_influences = len(self.influence_names)
+        block = np.zeros((len(self.vertex_ids), num_influences), dtype=np.float64)
+        block[self.entry_rows(), self.indices] = self.values
+        return block
+
+    def replace_rows(self, update):
+        """
+        Copy with the rows of the vertices in `update` (sorted vertex ids, same
+        influence table) swapped in. Vertices of update that are not rows here are ignored.
+        """
+        if not len(update) or not len(self): return self
+        pos = np.minimum(np.searchsorted(update.vertex_ids, self.vertex_ids), len(update) - 1)
+        hit = update.vertex_ids[pos] == self.vertex_ids
+        if not hit.any(): return self
+        starts = np.where(hit, update.indptr[pos], self.indptr[:-1])
+        counts = np.where(hit, update.indptr[pos + 1] - update.indptr[pos], np.diff(self.indptr))
+        indptr = np.zeros(len(self) + 1, dtype=np.int64); np.cumsum(counts, out=indptr[1:])
+        rows = np.repeat(np.arange(len(self)), counts)
+        source = np.arange(indptr[-1]) - indptr[rows] + starts[rows]
+        from_update = hit[rows]
+        indices = np.empty(indptr[-1], dtype=np.int32); values = np.empty(indptr[-1], dtype=np.result_type(self.values, update.values))
+        indices[from_update] = update.indices[source[from_update]]; indices[~from_update] = self.indices[source[~from_update]]
+        values[from_update] = update.values[source[from_update]]; values[~from_update] = self.values[source[~from_update]]
+        return SparseWeights(self.mesh, self.vertex_ids, indptr, indices, values, self.influence_names)
+
+    def as_tuples(self):
+        return WeightTupleView(self)
+
+class WeightTupleView(Sequence):
+    """Read-only (vertex name, influence name, weight) rows over a SparseWeights, built on access."""
+    def __init__(self, weights):
+        self.weights = weights
+        self._rows = None
+
+    def __len__(self):
+        return self.weights.nnz
+
+    def __getitem__(self, index):
+        if isinstance(index, slice): return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0: index += len(self)
+        if not 0 <= index < len(self): raise IndexError(index)
+        if self._rows is None: self._rows = self.weights.entry_rows()
+        w = self.weights
+        return (f"{w.mesh}.vtx[{w.vertex_ids[self._rows[index]]}]", w.influence_names[w.indices[index]], float(w.values[index]))
+
+def solve_capsule_chain(points, segments, radius, falloff):
+    """
+    Capsule solve for every (parent_pos, child_pos, grandchild_pos) triple of one
+    joint chain. Each vertex keeps the triple whose middle joint it is closest to,
+    so every joint is blended on both sides like a single-joint capsule blend.
+    Scoring by the nearest bone would tie on every interior bone (it belongs to
+    two triples) and leave a seam at the joint.
+    Returns (segment index or -1, parent_weights, child_weights, distance to that joint).
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    best = np.full(len(points), -1, dtype=np.int64)
+    best_dist = np.full(len(points), np.inf)
+    parent_w = np.zeros(len(points)); child_w = np.zeros(len(points))
+    for i, (parent_pos, child_pos, grandchild_pos) in enumerate(segments):
+        dist_parent, dist_child = capsule_distances(points, parent_pos, child_pos, grandchild_pos)
+        seg_parent_w, seg_child_w, valid = capsule_weights_from_distances(dist_parent, dist_child, radius, falloff)
+        dist = np.linalg.norm(points - np.asarray(child_pos, dtype=np.float64)[:3], axis=1)
+        closer = valid & (dist < best_dist)
+        best[closer] = i; best_dist[closer] = dist[closer]
+        parent_w[closer] = seg_parent_w[closer]; child_w[closer] = seg_child_w[closer]
+    return best, parent_w, child_w, best_dist
+
+def solve_capsule_chains(points, chains, radius, falloff, max_workers=None):
+    """
+    Solves independent chains (lists of segment triples) in a thread pool, since
+    the NumPy work releases the GIL, and merges them so every vertex keeps the
+    segment whose middle joint is closest overall. Segment indices are returned
+    flattened across chains in the order they were given.
+    """
+    chains = [list(chain) for chain in chains if chain]
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(lambda chain: solve_capsule_chain(points, chain, radius, falloff), chains))
+    best = np.full(len(points), -1, dtype=np.int64); best_dist = np.full(len(points), np.inf)
+    parent_w = np.zeros(len(points)); child_w = np.zeros(len(points))
+    offset = 0
+    for chain, (seg, seg_parent_w, seg_child_w, dist) in zip(chains, results):
+        closer = (seg >= 0) & (dist < best_dist)
+        best[closer] = seg[closer] + offset; best_dist[closer] = dist[closer]
+        parent_w[closer] = seg_parent_w[closer]; child_w[closer] = seg_child_w[closer]
+        offset += len(chain)
+    return best, parent_w, child_w, best_dist
+
+class VertexGrid(object):
+    """
+    Uniform grid over vertex positions. Vertices are sorted by cell so a capsule
+    query only gathers the cells along the segment that its radius can reach,
+    then runs the exact distance test on those candidates.
+    """
+    def __init__(self, points, cell_size):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.cell_size = float(cell_size)
+        self.origin = self.points.min(axis=0) if len(self.points) else np.zeros(3)
+        coords = np.floor((self.points - self.origin) / self.cell_size).astype(np.int64)
+        self.dims = coords.max(axis=0) + 1 if len(coords) else np.ones(3, dtype=np.int64)
+        keys = np.ravel_multi_index(coords.T, self.dims) if len(coords) else np.zeros(0, dtype=np.int64)
+        self.order = np.argsort(keys, kind="stable")
+        self.cell_keys, self.cell_start, cell_counts = np.unique(keys[self.order], return_index=True, return_counts=True)
+        self.cell_end = self.cell_start + cell_counts
+
+    def matches(self, points, radius):
+        """True when this grid was built for these positions and suits the query radius."""
+        return len(points) == len(self.points) and 0.5 * self.cell_size <= radius <= 2.0 * self.cell_size and np.array_equal(points, self.points)
+
+    def query_segment(self, seg_start, seg_end, radius):
+        """Sorted ids of the vertices closer than radius to the segment."""
+        seg_start = np.asarray(seg_start, dtype=np.float64)[:3]; seg_end = np.asarray(seg_end, dtype=np.float64)[:3]
+        if not len(self.points): return np.zeros(0, dtype=np.int64)
+        # Walk the segment in steps of at most one cell and take the cells around
+        # each step, so the work follows the bone's length rather than its bounding box.
+        steps = int(np.ceil(np.linalg.norm(seg_end - seg_start) / self.cell_size)) + 1
+        samples = seg_start + np.linspace(0.0, 1.0, steps)[:, None] * (seg_end - seg_start)
+        reach = int(np.ceil((radius + 0.5 * self.cell_size) / self.cell_size))
+        offsets = np.stack(np.meshgrid(*[np.arange(-reach, reach + 1)] * 3, indexing="ij"), axis=-1).reshape(-1, 3)
+        sample_cells = np.floor((samples - self.origin) / self.cell_size).astype(np.int64)
+        cells = (sample_cells[:, None, :] + offsets[None, :, :]).reshape(-1, 3)
+        cells = cells[((cells >= 0) & (cells < self.dims)).all(axis=1)]
+        cells = np.array(np.unravel_index(np.unique(np.ravel_multi_index(cells.T, self.dims)), self.dims)).T
+        centers = self.origin + (cells + 0.5) * self.cell_size
+        cells = cells[segment_distances(centers, seg_start, seg_end) <= radius + 0.8661 * self.cell_size]
+        keys = np.ravel_multi_index(cells.T, self.dims)
+        pos = np.minimum(np.searchsorted(self.cell_keys, keys), max(len(self.cell_keys) - 1, 0))
+        pos = pos[self.cell_keys[pos] == keys]
+        counts = self.cell_end[pos] - self.cell_start[pos]
+        if not counts.sum(): return np.zeros(0, dtype=np.int64)
+        offsets = np.repeat(self.cell_start[pos] - np.cumsum(counts) + counts, counts)
+        candidates = self.order[offsets + np.arange(counts.sum())]
+        return np.sort(candidates[segment_distances(self.points[candidates], seg_start, seg_end) < radius])
+
+    def query_capsules(self, segments, radius):
+        """Union of query_segment over (start, end) pairs."""
+        hits = [self.query_segment(start, end, radius) for start, end in segments]
+        return np.unique(np.concatenate(hits)) if hits else np.zeros(0, dtype=np.int64)
@@ -0,0 +1,21 @@
+"""
+Deferred imports for the heavy modules (OpenMaya, NumPy, the util layer), so
+importing the UI module stays cheap and they load on first attribute access.
+"""
+import importlib
+
+class LazyModule(object):
+    """Stands in for a module and imports it the first time an attribute is read."""
+    def __init__(self, name, package=None):
+        self._name = name; self._package = package; self._module = None
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def load(self):
+        if self._module is None: self._module = importlib.import_module(self._name, self._package)
+        return self._module
+
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
@@ -0,0 +1,96 @@
+"""
+Lightweight profiling for the weight operations in blendWeightHelperUtil.
+
+Operations are wrapped with @profiled and their phases with `with phase(...)`.
+Each record keeps wall time, the maya.cmds / mel calls made while it was open
+and the vertex / influence counts it worked on. Finished operations go into a
+ring buffer that the dialog's profiler panel shows and that can be dumped as
+JSON for bug reports.
+"""
+import collections
+import json
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+HISTORY_SIZE = 200
+
+history = collections.deque(maxlen=HISTORY_SIZE)
+_active = []
+_listeners = []
+
+class CountingModule(object):
+    """Proxy for maya.cmds / maya.mel that counts calls into every open record."""
+    def __init__(self, module, prefix):
+        self._module = module; self._prefix = prefix; self._wrappers = {}
+
+    def __getattr__(self, name):
+        wrapper = self._wrappers.get(name)
+        if wrapper is None:
+            target = getattr(self._module, name)
+            if not callable(target): return target
+            key = f"{self._prefix}.{name}"
+            @wraps(target)
+            def wrapper(*args, **kwargs):
+                for record in _active: record["calls"][key] += 1
+                return target(*args, **kwargs)
+            self._wrappers[name] = wrapper
+        return wrapper
+
+@contextmanager
+def phase(name, vertices=None, influences=None):
+    """
+    Times a block. The yielded record can be updated while it runs, e.g.
+    record["vertices"] = n once the count is known. Nested phases are attached
+    to the enclosing one; outermost records land in `history`.
+    """
+    record = {"name": name, "start": time.time(), "wall_s": 0.0, "vertices": vertices, "influences": influences,
+              "calls": collections.Counter(), "phases": [], "error": None}
+    if _active: _active[-1]["phases"].append(record)
+    _active.append(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        record["error"] = repr(e); raise
+    finally:
+        record["wall_s"] = time.perf_counter() - start
+        _active.pop()
+        if not _active:
+            history.append(record)
+            for listener in list(_listeners): listener(record)
+
+def profiled(name=None):
+    """Decorator form of phase() for a whole operation."""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with phase(name or fn.__name__):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def add_listener(callback):
+    """callback(record) runs after every finished operation."""
+    if callback not in _listeners: _listeners.append(callback)
+
+def remove_listener(callback):
+    if callback in _listeners: _listeners.remove(callback)
+
+def clear():
+    history.clear()
+
+def format_record(record, indent=0):
+    """One line per record and phase: name, time, counts and cmds calls."""
+    counts = "".join(f" {key}={record[key]}" for key in ("vertices", "influences") if record[key] is not None)
+    calls = sum(record["calls"].values())
+    line = f"{'  ' * indent}{record['name']}: {record['wall_s'] * 1000.0:.1f} ms{counts} cmds={calls}"
+    if record["error"]: line += f" ERROR {record['error']}"
+    return "\n".join([line] + [format_record(child, indent + 1) for child in record["phases"]])
+
+def dump_json(path=None):
+    """The ring buffer as JSON text; also written to path when given."""
+    text = json.dumps(list(history), indent=2, default=int)
+    if path:
+        with open(path, "w") as f: f.write(text)
+    return text
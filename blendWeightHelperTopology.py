@@ -0,0 +1,128 @@
+"""
+Array-based mesh topology used by blendWeightHelperUtil for loop and ring walking.
+Like blendWeightHelperKernel this module never imports maya: it is built from the
+face counts / face vertex lists returned by MFnMesh.getVertices().
+"""
+import numpy as np
+
+def _csr(rows, columns, num_rows):
+    order = np.lexsort((columns, rows))
+    indptr = np.zeros(num_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=num_rows), out=indptr[1:])
+    return indptr, np.asarray(columns, dtype=np.int64)[order]
+
+def gather(indptr, indices, rows):
+    """Concatenated CSR rows for an array of row ids."""
+    rows = np.asarray(rows, dtype=np.int64)
+    starts = indptr[rows]; counts = indptr[rows + 1] - starts
+    if not counts.sum(): return np.zeros(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return indices[offsets + np.arange(counts.sum())]
+
+class MeshTopology(object):
+    """
+    Vertex/edge/face adjacency of a polygon mesh as CSR arrays:
+    vertex_vertices, vertex_edges, vertex_faces and edge_faces. Edges are the
+    unique sorted vertex pairs of the face boundaries, so their ids are this
+    class's own and not Maya's edge indices.
+    """
+    def __init__(self, num_vertices, face_counts, face_connects):
+        face_counts = np.asarray(face_counts, dtype=np.int64); face_connects = np.asarray(face_connects, dtype=np.int64)
+        self.num_vertices = int(num_vertices); self.num_faces = len(face_counts)
+        face_of_corner = np.repeat(np.arange(self.num_faces), face_counts)
+        face_start = np.repeat(np.cumsum(face_counts) - face_counts, face_counts)
+        corner = np.arange(len(face_connects))
+        next_corner = face_start + (corner - face_start + 1) % face_counts[face_of_corner]
+        pairs = np.sort(np.stack([face_connects, face_connects[next_corner]], axis=1), axis=1)
+        self.edges, corner_edge = np.unique(pairs, axis=0, return_inverse=True)
+        corner_edge = corner_edge.ravel()
+        num_edges = len(self.edges)
+        self.edge_faces_indptr, self.edge_faces = _csr(corner_edge, face_of_corner, num_edges)
+        edge_ids = np.arange(num_edges)
+        self.vertex_edges_indptr, self.vertex_edges = _csr(self.edges.ravel(), np.repeat(edge_ids, 2), self.num_vertices)
+        self.vertex_vertices_indptr, self.vertex_vertices = _csr(self.edges.ravel(), self.edges[:, ::-1].ravel(), self.num_vertices)
+        self.vertex_faces_indptr, self.vertex_faces = _csr(face_connects, face_of_corner, self.num_vertices)
+
+    def neighbours(self, vertex_ids):
+        """Unique one-ring neighbours of a set of vertices (the set itself included when adjacent)."""
+        return np.unique(gather(self.vertex_vertices_indptr, self.vertex_vertices, vertex_ids))
+
+    def edge_id(self, v0, v1):
+        v0, v1 = min(v0, v1), max(v0, v1)
+        edges = gather(self.vertex_edges_indptr, self.vertex_edges, [v0])
+        match = edges[self.edges[edges, 1] == v1] if v0 != v1 else edges[:0]
+        return int(match[0]) if len(match) else None
+
+    def edge_loop(self, edge):
+        """
+        Edge ids of the loop through `edge`, walking across valence-4 vertices
+        by always taking the edge that shares no face with the incoming one.
+        """
+        loop = [edge]; seen = {edge}
+        for start_vertex in self.edges[edge]:
+            current, vertex = edge, int(start_vertex)
+            while True:
+                vertex_edges = gather(self.vertex_edges_indptr, self.vertex_edges, [vertex])
+                if len(vertex_edges) != 4: break
+                current_faces = gather(self.edge_faces_indptr, self.edge_faces, [current])
+                candidates = [e for e in vertex_edges if e != current and not np.isin(gather(self.edge_faces_indptr, self.edge_faces, [e]), current_faces).any()]
+                if len(candidates) != 1 or candidates[0] in seen: break
+                current = int(candidates[0]); seen.add(current); loop.append(current)
+                v0, v1 = self.edges[current]; vertex = int(v1 if v0 == vertex else v0)
+        return np.array(loop, dtype=np.int64)
+
+    def edge_loop_vertices(self, vertex_pairs):
+        """Vertices of the full edge loops through every (v0, v1) edge given."""
+        loops = [self.edge_loop(edge) for edge in (self.edge_id(int(v0), int(v1)) for v0, v1 in vertex_pairs) if edge is not None]
+        if not loops: return np.zeros(0, dtype=np.int64)
+        return np.unique(self.edges[np.concatenate(loops)])
+
+    def connected_parts(self, vertex_ids):
+        """Splits a vertex set into parts connected through edges inside the set."""
+        vertex_ids = np.unique(np.asarray(vertex_ids, dtype=np.int64))
+        inside = np.zeros(self.num_vertices, dtype=bool); inside[vertex_ids] = True
+        parts = []
+        for seed in vertex_ids:
+            if not inside[seed]: continue
+            inside[seed] = False; front = np.array([seed]); part = [front]
+            while len(front):
+                front = self.neighbours(front); front = front[inside[front]]
+                inside[front] = False; part.append(front)
+            parts.append(np.concatenate(part))
+        return [np.sort(part) for part in parts]
+
+    def smoothing_region(self, vertex_ids):
+        """
+        Neighbour graph for smoothing a vertex set. Returns (region, free_rows,
+        indptr, indices): region is the sorted set plus its one-ring border,
+        free_rows are the positions of the set in region, and row i of the CSR
+        pair lists the neighbours of region[free_rows[i]] as positions in region.
+        """
+        vertex_ids = np.unique(np.asarray(vertex_ids, dtype=np.int64))
+        region = np.union1d(vertex_ids, self.neighbours(vertex_ids))
+        free_rows = np.searchsorted(region, vertex_ids)
+        starts = self.vertex_vertices_indptr[vertex_ids]
+        indptr = np.zeros(len(vertex_ids) + 1, dtype=np.int64)
+        np.cumsum(self.vertex_vertices_indptr[vertex_ids + 1] - starts, out=indptr[1:])
+        indices = np.searchsorted(region, gather(self.vertex_vertices_indptr, self.vertex_vertices, vertex_ids))
+        return region, free_rows, indptr, indices
+
+    def side_rings(self, loop_vertices, count):
+        """
+        Walks `count` vertex rings out from both sides of a closed loop. Returns
+        two lists of ring vertex arrays (nearest ring first), or None when the
+        first ring does not split into exactly two sides, e.g. at a mesh border.
+        """
+        visited = np.zeros(self.num_vertices, dtype=bool)
+        loop_vertices = np.asarray(loop_vertices, dtype=np.int64); visited[loop_vertices] = True
+        first = self.neighbours(loop_vertices); first = first[~visited[first]]
+        sides = self.connected_parts(first)
+        if len(sides) != 2: return None
+        visited[first] = True
+        rings = [[sides[0]], [sides[1]]]
+        for _ in range(count - 1):
+            for side in rings:
+                ring = self.neighbours(side[-1]); ring = ring[~visited[ring]]
+                if not len(ring): return None
+                visited[ring] = True; side.append(ring)
+        return rings
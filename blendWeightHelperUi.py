@@ -1,38 +1,151 @@
+import time
+_IMPORT_START = time.perf_counter()
+
 try:
     from PySide2 import QtCore, QtGui, QtWidgets
-    from shiboken2 import wrapInstance
 except ImportError:
     from PySide6 import QtCore, QtGui, QtWidgets
-    from shiboken6 import wrapInstance
 
-import maya.OpenMayaUI as omui
 import maya.cmds as cmds
-from functools import partial
 import importlib
+import sys
+from functools import partial
+
+from . import blendWeightHelperProfile as BlndWghtProfile
+from .blendWeightHelperLazy import LazyModule
+
+# NumPy, OpenMaya and the util layer load when the dialog is first built.
+np = LazyModule("numpy")
+BlndWghtUtil = LazyModule(".blendWeightHelperUtil", __package__)
+
+SELECTION_DEBOUNCE_MS = 50
+PROGRESS_DELAY_MS = 300
+SNAPSHOT_FILTER = "Blend Weight Snapshot (*.bwh)"
+PROFILE_FILTER = "Profile JSON (*.json)"
+
+class WeightProgress(object):
+    """
+    progress(done, total) callback for the util write functions, shown in a Qt
+    progress dialog. It is only called once per committed batch, never per vertex.
+    """
+    def __init__(self, parent, title):
+        self.parent = parent; self.title = title; self.dialog = None
+    def __enter__(self):
+        self.dialog = QtWidgets.QProgressDialog(self.title, "Cancel", 0, 1, self.parent)
+        self.dialog.setWindowModality(QtCore.Qt.WindowModal); self.dialog.setMinimumDuration(PROGRESS_DELAY_MS); self.dialog.setValue(0)
+        return self
+    def __exit__(self, *exc_info):
+        self.dialog.reset(); self.dialog.deleteLater(); self.dialog = None
+    def __call__(self, done, total):
+        self.dialog.setMaximum(total); self.dialog.setValue(done)
+        QtWidgets.QApplication.processEvents()
+        return not self.dialog.wasCanceled()
+
+class WeightTableModel(QtCore.QAbstractTableModel):
+    """
+    Vertex/Joint/Weight rows read straight from a SparseWeights matrix. Sorting and
+    filtering only reorder an index array over the stored entries, so the weight
+    arrays are never copied and the view only asks for the rows it draws.
+    """
+    HEADERS = ["Vertex", "Joint", "Weight"]
+    weight_edited = QtCore.Signal(str, str, float)
+
+    def __init__(self, parent=None):
+        super(WeightTableModel, self).__init__(parent)
+        self.weights = None; self.entry_rows = np.zeros(0, dtype=np.int64); self.rows = np.zeros(0, dtype=np.int64)
+        self.sort_column = None; self.sort_order = QtCore.Qt.AscendingOrder
+        self.joint_filter = None; self.min_weight = 0.0
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal: return self.HEADERS[section]
+        return super(WeightTableModel, self).headerData(section, orientation, role)
+    def flags(self, index):
+        flags = super(WeightTableModel, self).flags(index)
+        return flags | QtCore.Qt.ItemIsEditable if index.column() == 2 else flags
+
+    def entry(self, row):
+        """(vertex name, joint name, weight) shown on a view row."""
+        i = self.rows[row]; w = self.weights
+        return f"{w.mesh}.vtx[{w.vertex_ids[self.entry_rows[i]]}]", w.influence_names[w.indices[i]], float(w.values[i])
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or role not in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole): return None
+        value = self.entry(index.row())[index.column()]
+        return f"{value:.3f}" if index.column() == 2 else value
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        if role != QtCore.Qt.EditRole or index.column() != 2: return False
+        try: new_weight = float(value)
+        except (ValueError, TypeError): cmds.warning("Invalid weight value."); return False
+        vtx, joint, _ = self.entry(index.row())
+        self.weight_edited.emit(vtx, joint, new_weight)
+        return True
+
+    def set_weights(self, weights):
+        """Shows new weights, updating cells in place when the vertex/influence layout is unchanged."""
+        old = self.weights
+        same_layout = (old is not None and weights is not None and old.mesh == weights.mesh and old.influence_names == weights.influence_names
+                       and np.array_equal(old.vertex_ids, weights.vertex_ids)
+                       and np.array_equal(old.indptr, weights.indptr) and np.array_equal(old.indices, weights.indices))
+        if not same_layout:
+            self.beginResetModel()
+            self.weights = weights
+            self.entry_rows = weights.entry_rows() if weights is not None else np.zeros(0, dtype=np.int64)
+            self.rows = self._visible_entries()
+            self.endResetModel(); return
+        changed = np.flatnonzero(old.values != weights.values)
+        self.weights = weights
+        if not len(changed): return
+        if self.sort_column == 2 or self.min_weight > 0.0: self._relayout(); return
+        rows = np.flatnonzero(np.isin(self.rows, changed))
+        if len(rows): self.dataChanged.emit(self.index(int(rows[0]), 2), self.index(int(rows[-1]), 2))
 
-from . import blendWeightHelperUtil as BlndWghtUtil
-importlib.reload(BlndWghtUtil)
+    def set_filter(self, joint=None, min_weight=0.0):
+        self.joint_filter = joint or None; self.min_weight = min_weight
+        self._relayout()
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+        self.sort_column = column if column >= 0 else None; self.sort_order = order
+        self._relayout()
 
-class WeightTableWidget(QtWidgets.QTableWidget):
+    def _relayout(self):
+        self.layoutAboutToBeChanged.emit()
+        self.rows = self._visible_entries()
+        self.layoutChanged.emit()
+    def _visible_entries(self):
+        w = self.weights
+        if w is None: return np.zeros(0, dtype=np.int64)
+        keep = w.values > self.min_weight
+        if self.joint_filter is not None:
+            column = w.influence_names.index(self.joint_filter) if self.joint_filter in w.influence_names else -1
+            keep &= w.indices == column
+        rows = np.flatnonzero(keep)
+        if self.sort_column is None: return rows
+        if self.sort_column == 0: key = w.vertex_ids[self.entry_rows[rows]]
+        elif self.sort_column == 1: key = np.argsort(np.argsort(w.influence_names))[w.indices[rows]]
+        else: key = w.values[rows]
+        order = np.argsort(key, kind="stable")
+        if self.sort_order == QtCore.Qt.DescendingOrder: order = order[::-1]
+        return rows[order]
+
+class WeightTableView(QtWidgets.QTableView):
     def keyPressEvent(self, event):
         if event.key() in (QtCore.Qt.Key_Return, QtCore.Qt.Key_Enter):
-            selected_items = self.selectedItems()
-            weight_items = [item for item in selected_items if item.column() == 2]
-            if len(weight_items) > 1: self.batch_edit_weights(weight_items); return
-        super(WeightTableWidget, self).keyPressEvent(event)
-    def batch_edit_weights(self, items):
-        num_items = len(items); current_value = float(items[0].text())
-        result = cmds.promptDialog(title='Batch Edit Weights', message=f'Enter New Weight for {num_items} Items:', text=str(current_value), button=['OK', 'Cancel'], defaultButton='OK', cancelButton='Cancel', dismissString='Cancel')
+            weight_rows = sorted({index.row() for index in self.selectedIndexes() if index.column() == 2})
+            if len(weight_rows) > 1: self.batch_edit_weights(weight_rows); return
+        super(WeightTableView, self).keyPressEvent(event)
+    def batch_edit_weights(self, rows):
+        model = self.model(); num_items = len(rows); current_value = model.entry(rows[0])[2]
+        result = cmds.promptDialog(title='Batch Edit Weights', message=f'Enter New Weight for {num_items} Items:', text=f"{current_value:.3f}", button=['OK', 'Cancel'], defaultButton='OK', cancelButton='Cancel', dismissString='Cancel')
         if result == 'OK':
             try:
                 new_weight = float(cmds.promptDialog(query=True, text=True))
-                weight_update_data = []
-                for item in items:
-                    row, vtx_item, joint_item = item.row(), self.item(item.row(), 0), self.item(item.row(), 1)
-                    if vtx_item and joint_item: weight_update_data.append((vtx_item.text(), joint_item.text(), new_weight))
+                weight_update_data = [model.entry(row)[:2] + (new_weight,) for row in rows]
                 if weight_update_data:
-                    BlndWghtUtil.set_multiple_vertex_weights(weight_update_data)
-                    QtCore.QTimer.singleShot(100, self.parent().populate_smooth_skin_table)
+                    with WeightProgress(self, "Batch Applying Weights") as progress:
+                        changed = BlndWghtUtil.set_multiple_vertex_weights(weight_update_data, progress)
+                    QtCore.QTimer.singleShot(100, partial(self.parent().refresh_rows, changed))
             except (ValueError, TypeError): cmds.warning("Invalid number entered.")
 
 class BlendWeightHelper(QtWidgets.QDialog):
@@ -40,7 +153,9 @@ class BlendWeightHelper(QtWidgets.QDialog):
         super(BlendWeightHelper, self).__init__(parent)
         self.setWindowTitle("Blend Weight Helper (Dual Mode Final)")
         self.resize(340, 600); self.setMinimumWidth(340)
-        self.last_selection = []
+        self.last_selection = (None, np.zeros(0, dtype=np.int64))
+        self.selection_callback_id = None
+        self.capsule_preview = BlndWghtUtil.CapsulePreview()
         layout = QtWidgets.QVBoxLayout(self)
         layout.addWidget(QtWidgets.QLabel("SELECT VERTEX THEN CLICK WEIGHT VALUE"))
         weight_layout = QtWidgets.QHBoxLayout()
@@ -61,26 +176,86 @@ class BlendWeightHelper(QtWidgets.QDialog):
         self.falloff_spinbox = QtWidgets.QDoubleSpinBox()
         self.falloff_spinbox.setRange(0.1, 5.0); self.falloff_spinbox.setSingleStep(0.1); self.falloff_spinbox.setValue(1.0)
         capsule_options_layout.addWidget(self.falloff_spinbox, 1, 1)
+        self.preview_checkbox = QtWidgets.QCheckBox("Live Preview (vertex colours)")
+        self.preview_checkbox.toggled.connect(self.toggle_capsule_preview)
+        capsule_options_layout.addWidget(self.preview_checkbox, 2, 0, 1, 2)
+        self.radius_spinbox.valueChanged.connect(self.update_capsule_preview); self.falloff_spinbox.valueChanged.connect(self.update_capsule_preview)
         auto_blend_layout.addLayout(capsule_options_layout)
-        auto_blend_layout.addWidget(QtWidgets.QLabel("Select vertices, then in Paint Tool, select a joint:"))
+        auto_blend_layout.addWidget(QtWidgets.QLabel("Select vertices (none = whole mesh), then in Paint Tool, select a joint:"))
         auto_capsule_btn = QtWidgets.QPushButton("APPLY LOCALIZED CAPSULE"); auto_capsule_btn.clicked.connect(self.run_localized_capsule)
         auto_blend_layout.addWidget(auto_capsule_btn)
         
-        auto_blend_layout.addWidget(QtWidgets.QLabel("<b>2. Simple 3-Loop Blend</b>"))
-        auto_blend_layout.addWidget(QtWidgets.QLabel("Select 3 separate EDGE loops, then in Paint Tool, select a joint:"))
-        auto_simple_btn = QtWidgets.QPushButton("APPLY SIMPLE 3-LOOP BLEND"); auto_simple_btn.clicked.connect(self.run_simple_blend)
+        auto_blend_layout.addWidget(QtWidgets.QLabel("<b>2. Simple Loop Blend</b>"))
+        simple_options_layout = QtWidgets.QGridLayout()
+        simple_options_layout.addWidget(QtWidgets.QLabel("Rings Per Side:"), 0, 0)
+        self.rings_spinbox = QtWidgets.QSpinBox()
+        self.rings_spinbox.setRange(1, 20); self.rings_spinbox.setValue(1)
+        simple_options_layout.addWidget(self.rings_spinbox, 0, 1)
+        auto_blend_layout.addLayout(simple_options_layout)
+        auto_blend_layout.addWidget(QtWidgets.QLabel("Select a central EDGE or vertex loop, then in Paint Tool, select a joint:"))
+        auto_simple_btn = QtWidgets.QPushButton("APPLY SIMPLE LOOP BLEND"); auto_simple_btn.clicked.connect(self.run_simple_blend)
         auto_blend_layout.addWidget(auto_simple_btn)
 
+        auto_blend_layout.addWidget(QtWidgets.QLabel("<b>3. Batch Capsule Blend (Skeleton)</b>"))
+        auto_blend_layout.addWidget(QtWidgets.QLabel("Select a root joint or several joints (plus vertices to limit it):"))
+        batch_capsule_btn = QtWidgets.QPushButton("APPLY BATCH CAPSULE"); batch_capsule_btn.clicked.connect(self.run_batch_capsule)
+        auto_blend_layout.addWidget(batch_capsule_btn)
+
+        auto_blend_layout.addWidget(QtWidgets.QLabel("<b>4. Smooth Weights</b>"))
+        smooth_options_layout = QtWidgets.QGridLayout()
+        smooth_options_layout.addWidget(QtWidgets.QLabel("Iterations:"), 0, 0)
+        self.smooth_iterations_spinbox = QtWidgets.QSpinBox()
+        self.smooth_iterations_spinbox.setRange(1, 100); self.smooth_iterations_spinbox.setValue(5)
+        smooth_options_layout.addWidget(self.smooth_iterations_spinbox, 0, 1)
+        smooth_options_layout.addWidget(QtWidgets.QLabel("Strength:"), 1, 0)
+        self.smooth_strength_spinbox = QtWidgets.QDoubleSpinBox()
+        self.smooth_strength_spinbox.setRange(0.05, 1.0); self.smooth_strength_spinbox.setSingleStep(0.05); self.smooth_strength_spinbox.setValue(0.5)
+        smooth_options_layout.addWidget(self.smooth_strength_spinbox, 1, 1)
+        auto_blend_layout.addLayout(smooth_options_layout)
+        auto_blend_layout.addWidget(QtWidgets.QLabel("Select vertices; weights around the selection stay locked:"))
+        smooth_btn = QtWidgets.QPushButton("APPLY SMOOTH"); smooth_btn.clicked.connect(self.run_smooth_weights)
+        auto_blend_layout.addWidget(smooth_btn)
+
         auto_blend_group.setLayout(auto_blend_layout)
         layout.addWidget(auto_blend_group)
         
+        limits_group = QtWidgets.QGroupBox("Influence Limits")
+        limits_layout = QtWidgets.QGridLayout(limits_group)
+        limits_layout.addWidget(QtWidgets.QLabel("Max Influences:"), 0, 0)
+        self.max_influences_spinbox = QtWidgets.QSpinBox()
+        self.max_influences_spinbox.setRange(1, 32); self.max_influences_spinbox.setValue(4)
+        limits_layout.addWidget(self.max_influences_spinbox, 0, 1)
+        limits_layout.addWidget(QtWidgets.QLabel("Min Weight:"), 1, 0)
+        self.prune_weight_spinbox = QtWidgets.QDoubleSpinBox()
+        self.prune_weight_spinbox.setRange(0.0, 0.5); self.prune_weight_spinbox.setSingleStep(0.005); self.prune_weight_spinbox.setDecimals(3); self.prune_weight_spinbox.setValue(0.01)
+        limits_layout.addWidget(self.prune_weight_spinbox, 1, 1)
+        limits_layout.addWidget(QtWidgets.QLabel("Select a mesh (or vertices to limit it):"), 2, 0, 1, 2)
+        limits_btn = QtWidgets.QPushButton("ENFORCE INFLUENCE LIMITS"); limits_btn.clicked.connect(self.run_influence_limits)
+        limits_layout.addWidget(limits_btn, 3, 0, 1, 2)
+        layout.addWidget(limits_group)
+
         layout.addWidget(QtWidgets.QLabel("MAYA TOOL SHORTCUT"))
         paint_btn = QtWidgets.QPushButton("OPEN PAINT SKIN WEIGHT TOOL"); paint_btn.clicked.connect(BlndWghtUtil.open_paint_skin_weight_tool)
         layout.addWidget(paint_btn)
+        snapshot_row = QtWidgets.QHBoxLayout()
+        export_btn = QtWidgets.QPushButton("EXPORT WEIGHTS"); export_btn.clicked.connect(self.export_weights); snapshot_row.addWidget(export_btn)
+        import_btn = QtWidgets.QPushButton("IMPORT WEIGHTS"); import_btn.clicked.connect(self.import_weights); snapshot_row.addWidget(import_btn)
+        layout.addLayout(snapshot_row)
         layout.addWidget(QtWidgets.QLabel("SMOOTH SKIN EDITOR VIEW (MULTI-SELECT + PRESS ENTER)"))
-        self.table = WeightTableWidget(parent=self)
-        self.table.setColumnCount(3); self.table.setHorizontalHeaderLabels(["Vertex", "Joint", "Weight"])
-        self.table.itemChanged.connect(self.on_weight_edited)
+        filter_layout = QtWidgets.QHBoxLayout()
+        filter_layout.addWidget(QtWidgets.QLabel("Joint:"))
+        self.joint_filter_combo = QtWidgets.QComboBox(); self.joint_filter_combo.addItem("All Joints")
+        self.joint_filter_combo.currentIndexChanged.connect(self.apply_table_filter); filter_layout.addWidget(self.joint_filter_combo, 1)
+        filter_layout.addWidget(QtWidgets.QLabel("Min:"))
+        self.min_weight_spinbox = QtWidgets.QDoubleSpinBox()
+        self.min_weight_spinbox.setRange(0.0, 1.0); self.min_weight_spinbox.setSingleStep(0.05); self.min_weight_spinbox.setDecimals(3)
+        self.min_weight_spinbox.valueChanged.connect(self.apply_table_filter); filter_layout.addWidget(self.min_weight_spinbox)
+        layout.addLayout(filter_layout)
+        self.model = WeightTableModel(self)
+        self.model.weight_edited.connect(self.on_weight_edited)
+        self.table = WeightTableView(self)
+        self.table.setModel(self.model); self.table.setSortingEnabled(True); self.table.sortByColumn(-1, QtCore.Qt.AscendingOrder)
+        self.table.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
         self.table.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
         layout.addWidget(self.table)
         btn_row = QtWidgets.QHBoxLayout()
@@ -88,45 +263,168 @@ class BlendWeightHelper(QtWidgets.QDialog):
         reset_btn = QtWidgets.QPushButton("CLEAR SELECTION"); reset_btn.clicked.connect(BlndWghtUtil.reset_selected_vertices); btn_row.addWidget(reset_btn)
         close_btn = QtWidgets.QPushButton("CLOSE"); close_btn.clicked.connect(self.close); btn_row.addWidget(close_btn)
         layout.addLayout(btn_row)
-        self.timer = QtCore.QTimer(self); self.timer.timeout.connect(self.check_selection_change); self.timer.start(500)
-        self.check_selection_change()
+        self.profiler_group = QtWidgets.QGroupBox("Profiler"); self.profiler_group.setCheckable(True); self.profiler_group.setChecked(False)
+        profiler_layout = QtWidgets.QVBoxLayout(self.profiler_group)
+        self.profiler_text = QtWidgets.QPlainTextEdit(); self.profiler_text.setReadOnly(True); self.profiler_text.setMaximumBlockCount(2000)
+        self.profiler_text.setVisible(False); profiler_layout.addWidget(self.profiler_text)
+        profiler_btn_row = QtWidgets.QHBoxLayout()
+        dump_btn = QtWidgets.QPushButton("DUMP JSON"); dump_btn.clicked.connect(self.dump_profile); profiler_btn_row.addWidget(dump_btn)
+        clear_profile_btn = QtWidgets.QPushButton("CLEAR"); clear_profile_btn.clicked.connect(self.clear_profile); profiler_btn_row.addWidget(clear_profile_btn)
+        self.profiler_buttons = QtWidgets.QWidget(); self.profiler_buttons.setLayout(profiler_btn_row); self.profiler_buttons.setVisible(False)
+        profiler_layout.addWidget(self.profiler_buttons)
+        self.profiler_group.toggled.connect(self.toggle_profiler)
+        layout.addWidget(self.profiler_group)
+        # Maya fires SelectionChanged for every intermediate step of a drag or
+        # grow, so restart a short single-shot timer and read the selection once.
+        self.selection_timer = QtCore.QTimer(self); self.selection_timer.setSingleShot(True); self.selection_timer.setInterval(SELECTION_DEBOUNCE_MS)
+        self.selection_timer.timeout.connect(self.check_selection_change)
 
     def run_localized_capsule(self):
         radius = self.radius_spinbox.value(); falloff = self.falloff_spinbox.value()
-        BlndWghtUtil.apply_localized_capsule_blend(radius, falloff)
-        QtCore.QTimer.singleShot(100, self.populate_smooth_skin_table)
+        with WeightProgress(self, "Applying Localized Capsule") as progress:
+            if self.capsule_preview.active: changed = self.capsule_preview.commit(radius, falloff, progress)
+            else: changed = BlndWghtUtil.apply_localized_capsule_blend(radius, falloff, progress)
+        self.preview_checkbox.setChecked(False)
+        QtCore.QTimer.singleShot(100, partial(self.refresh_rows, changed))
+    def toggle_capsule_preview(self, enabled):
+        if not enabled: self.capsule_preview.stop(); return
+        if self.capsule_preview.start(): self.update_capsule_preview()
+        else: self._uncheck_preview()
+    def update_capsule_preview(self, *args):
+        if not self.capsule_preview.active: return
+        if not self.capsule_preview.update(self.radius_spinbox.value(), self.falloff_spinbox.value()): self._uncheck_preview()
+    def _uncheck_preview(self):
+        # The preview is already stopped; only the checkbox needs to follow.
+        self.preview_checkbox.blockSignals(True); self.preview_checkbox.setChecked(False); self.preview_checkbox.blockSignals(False)
+    def run_batch_capsule(self):
+        with WeightProgress(self, "Applying Batch Capsule") as progress:
+            changed = BlndWghtUtil.apply_batch_capsule_blend(self.radius_spinbox.value(), self.falloff_spinbox.value(), progress=progress)
+        QtCore.QTimer.singleShot(100, partial(self.refresh_rows, changed))
     def run_simple_blend(self):
-        BlndWghtUtil.apply_simple_blend()
-        QtCore.QTimer.singleShot(100, self.populate_smooth_skin_table)
+        with WeightProgress(self, "Applying Simple Blend") as progress:
+            changed = BlndWghtUtil.apply_simple_blend(self.rings_spinbox.value(), progress)
+        QtCore.QTimer.singleShot(100, partial(self.refresh_rows, changed))
+    def run_smooth_weights(self):
+        with WeightProgress(self, "Smoothing Weights") as progress:
+            changed = BlndWghtUtil.apply_smooth_weights(self.smooth_iterations_spinbox.value(), self.smooth_strength_spinbox.value(), progress)
+        QtCore.QTimer.singleShot(100, partial(self.refresh_rows, changed))
+    def run_influence_limits(self):
+        with WeightProgress(self, "Enforcing Influence Limits") as progress:
+            changed = BlndWghtUtil.enforce_influence_limits(self.max_influences_spinbox.value(), self.prune_weight_spinbox.value(), progress=progress)
+        QtCore.QTimer.singleShot(100, partial(self.refresh_rows, changed))
     def apply_weight_from_button(self, value):
-        BlndWghtUtil.apply_weight(value); QtCore.QTimer.singleShot(50, self.populate_smooth_skin_table)
+        changed = BlndWghtUtil.apply_weight(value); QtCore.QTimer.singleShot(50, partial(self.refresh_rows, changed))
+    def export_weights(self):
+        paths = cmds.fileDialog2(caption="Export Weight Snapshot", fileFilter=SNAPSHOT_FILTER, fileMode=0)
+        if paths: BlndWghtUtil.export_skin_weights(paths[0])
+    def import_weights(self):
+        paths = cmds.fileDialog2(caption="Import Weight Snapshot", fileFilter=SNAPSHOT_FILTER, fileMode=1)
+        if paths:
+            with WeightProgress(self, "Importing Weights") as progress:
+                changed = BlndWghtUtil.import_skin_weights(paths[0], progress=progress)
+            QtCore.QTimer.singleShot(100, partial(self.refresh_rows, changed))
+    def toggle_profiler(self, enabled):
+        self.profiler_text.setVisible(enabled); self.profiler_buttons.setVisible(enabled)
+        if enabled: self.refresh_profiler()
+    def refresh_profiler(self):
+        stats = BlndWghtUtil.skin_cluster_cache_stats()
+        lines = [BlndWghtProfile.format_record(record) for record in BlndWghtProfile.history]
+        lines.append("skinCluster cache: " + ", ".join(f"{key}={value}" for key, value in stats.items()))
+        self.profiler_text.setPlainText("\n".join(lines))
+        self.profiler_text.verticalScrollBar().setValue(self.profiler_text.verticalScrollBar().maximum())
+    def on_profile_record(self, record):
+        if self.profiler_group.isChecked(): self.profiler_text.appendPlainText(BlndWghtProfile.format_record(record))
+    def dump_profile(self):
+        paths = cmds.fileDialog2(caption="Dump Profile", fileFilter=PROFILE_FILTER, fileMode=0)
+        if paths: BlndWghtProfile.dump_json(paths[0])
+    def clear_profile(self):
+        BlndWghtProfile.clear(); self.refresh_profiler()
+    def showEvent(self, event):
+        super(BlendWeightHelper, self).showEvent(event)
+        if self.selection_callback_id is None:
+            self.selection_callback_id = BlndWghtUtil.add_selection_changed_callback(self.on_maya_selection_changed)
+        BlndWghtProfile.add_listener(self.on_profile_record)
+        self.check_selection_change()
+    def hideEvent(self, event):
+        if self.selection_callback_id is not None:
+            BlndWghtUtil.remove_callback(self.selection_callback_id); self.selection_callback_id = None
+        BlndWghtProfile.remove_listener(self.on_profile_record)
+        self.selection_timer.stop()
+        self.preview_checkbox.setChecked(False); self.capsule_preview.stop()
+        super(BlendWeightHelper, self).hideEvent(event)
+    def on_maya_selection_changed(self, *args):
+        self.selection_timer.start()
     def check_selection_change(self):
-        current = cmds.ls(selection=True, fl=True) or []
-        if current != self.last_selection: self.last_selection = current; self.populate_smooth_skin_table()
-    def on_weight_edited(self, item):
-        if item.column() != 2 or len(self.table.selectedItems()) > 1: return
-        try: new_weight = float(item.text())
-        except (ValueError, TypeError): cmds.warning("Invalid weight value."); self.populate_smooth_skin_table(); return
-        row, vtx_item, joint_item = item.row(), self.table.item(item.row(), 0), self.table.item(item.row(), 1)
-        if vtx_item and joint_item:
-            BlndWghtUtil.set_specific_vertex_weight(vtx_item.text(), joint_item.text(), new_weight)
-            QtCore.QTimer.singleShot(50, self.populate_smooth_skin_table)
-    def populate_smooth_skin_table(self):
-        self.table.blockSignals(True)
+        mesh, vertex_ids = BlndWghtUtil.get_selected_vertices()
+        last_mesh, last_ids = self.last_selection
+        if mesh != last_mesh or not np.array_equal(vertex_ids, last_ids):
+            self.last_selection = (mesh, vertex_ids); self.populate_smooth_skin_table()
+            if self.capsule_preview.active: self.toggle_capsule_preview(True)
+    def on_weight_edited(self, vtx, joint, new_weight):
+        changed = BlndWghtUtil.set_specific_vertex_weight(vtx, joint, new_weight)
+        QtCore.QTimer.singleShot(50, partial(self.refresh_rows, changed))
+    def apply_table_filter(self, *args):
+        joint = self.joint_filter_combo.currentText() if self.joint_filter_combo.currentIndex() > 0 else None
+        self.model.set_filter(joint, self.min_weight_spinbox.value())
+    def _update_joint_filter(self, influence_names):
+        current = [self.joint_filter_combo.itemText(i) for i in range(1, self.joint_filter_combo.count())]
+        if current == influence_names: return
+        selected = self.joint_filter_combo.currentText()
+        self.joint_filter_combo.blockSignals(True)
         try:
-            data = BlndWghtUtil.get_vertex_weights_all(); self.table.setRowCount(0)
-            if not data: return
-            self.table.setRowCount(len(data))
-            for row, (vtx, joint, value) in enumerate(data):
-                self.table.setItem(row, 0, QtWidgets.QTableWidgetItem(vtx))
-                self.table.setItem(row, 1, QtWidgets.QTableWidgetItem(joint))
-                self.table.setItem(row, 2, QtWidgets.QTableWidgetItem(f"{value:.3f}"))
-        finally: self.table.blockSignals(False)
-
-def run():
+            self.joint_filter_combo.clear(); self.joint_filter_combo.addItem("All Joints"); self.joint_filter_combo.addItems(influence_names)
+            self.joint_filter_combo.setCurrentIndex(max(self.joint_filter_combo.findText(selected), 0))
+        finally: self.joint_filter_combo.blockSignals(False)
+        self.apply_table_filter()
+    def populate_smooth_skin_table(self):
+        weights = BlndWghtUtil.read_selection_weights()
+        if weights is not None: self._update_joint_filter(weights.influence_names)
+        self.model.set_weights(weights)
+    def refresh_rows(self, vertex_ids):
+        """After an edit only the vertices it changed are read again; a full read is left to selection changes."""
+        if vertex_ids is None or self.model.weights is None: return
+        self.model.set_weights(BlndWghtUtil.refresh_vertex_weights(self.model.weights, vertex_ids))
+
+# Reloaded leaves first so every module picks up the fresh ones it imports.
+_DEV_RELOAD_ORDER = ("blendWeightHelperLazy", "blendWeightHelperProfile", "blendWeightHelperKernel", "blendWeightHelperTopology",
+                     "blendWeightHelperIO", "blendWeightHelperCmd", "blendWeightHelperUtil")
+
+def _reload_tool():
+    if BlndWghtUtil.loaded: BlndWghtUtil.release_caches()
+    for name in _DEV_RELOAD_ORDER:
+        module = sys.modules.get(f"{__package__}.{name}")
+        if module is not None: importlib.reload(module)
+    return importlib.reload(sys.modules[__name__])
+
+def run(reload=False):
+    """
+    Shows the tool. An open dialog is reused, so its table and the util caches
+    survive between launches. reload=True is a developer option: it closes the
+    dialog, reloads the tool modules and builds a fresh one. The time from the
+    call to the visible dialog is shown in the viewport and kept as a "launch"
+    profiler record.
+    """
     global ui
-    try: ui.close(); ui.deleteLater()
-    except: pass
-    maya_main_window = wrapInstance(int(omui.MQtUtil.mainWindow()), QtWidgets.QWidget)
-    ui = BlendWeightHelper(parent=maya_main_window)
-    ui.show()
\ No newline at end of file
+    try:
+        from shiboken2 import wrapInstance, isValid
+    except ImportError:
+        from shiboken6 import wrapInstance, isValid
+    if reload:
+        try: ui.close(); ui.deleteLater()
+        except: pass
+        ui = None
+        return _reload_tool().run()
+    with BlndWghtProfile.phase("launch") as record:
+        existing = globals().get("ui")
+        record["reused"] = existing is not None and isValid(existing)
+        if not record["reused"]:
+            import maya.OpenMayaUI as omui
+            maya_main_window = wrapInstance(int(omui.MQtUtil.mainWindow()), QtWidgets.QWidget)
+            ui = BlendWeightHelper(parent=maya_main_window)
+            record["import_s"] = _IMPORT_S
+        ui.show(); ui.raise_(); ui.activateWindow()
+    reused = " (reused window)" if record["reused"] else ""
+    cmds.inViewMessage(amg=f"Blend Weight Helper ready in {record['wall_s'] * 1000.0:.0f} ms{reused}.", pos="topCenter", fade=True)
+    return ui
+
+_IMPORT_S = time.perf_counter() - _IMPORT_START
@@ -1,118 +1,279 @@
-import maya.cmds as cmds
-import maya.mel as mel
-import maya.api.OpenMaya as om
-
-def apply_localized_capsule_blend(radius, falloff):
-    selected_verts = cmds.ls(sl=True, fl=True)
-    selected_verts = cmds.filterExpand(selected_verts, sm=31)
-    if not selected_verts:
-        cmds.warning("Please select vertices to apply the blend to."); return
+import maya.cmds
+import maya.mel
+import numpy as np
+import os
+import re
+from functools import partial
+
+from . import blendWeightHelperKernel as BlndWghtKernel
+from . import blendWeightHelperTopology as BlndWghtTopology
+from . import blendWeightHelperProfile as BlndWghtProfile
+from .blendWeightHelperLazy import LazyModule
+
+# The API modules and the write/snapshot helpers load on first use.
+om = LazyModule("maya.api.OpenMaya")
+oma = LazyModule("maya.api.OpenMayaAnim")
+BlndWghtCmd = LazyModule(".blendWeightHelperCmd", __package__)
+BlndWghtIO = LazyModule(".blendWeightHelperIO", __package__)
+
+# Every cmds / mel call is counted into the open profiler phases.
+cmds = BlndWghtProfile.CountingModule(maya.cmds, "cmds")
+mel = BlndWghtProfile.CountingModule(maya.mel, "mel")
+
+def _resolve_capsule_setup():
+    """
+    Selection, Paint Tool joints and skinCluster of a localized capsule blend,
+    or None after a warning when something is missing.
+    """
+    selection_mesh, selected_ids = get_selected_vertices()
     ctx = cmds.currentCtx()
     if not ctx.startswith('artAttrSkin'):
-        cmds.warning("Please open the Paint Skin Weights Tool and select an influence joint."); return
+        cmds.warning("Please open the Paint Skin Weights Tool and select an influence joint."); return None
     child_jnt = cmds.artAttrSkinPaintCtx(ctx, q=True, influence=True)
     if not child_jnt:
-        cmds.warning("No influence is selected in the Paint Tool window."); return
+        cmds.warning("No influence is selected in the Paint Tool window."); return None
     parents = cmds.listRelatives(child_jnt, p=True, type="joint", f=True)
     if not parents:
-        cmds.warning(f"Could not find a parent joint for '{child_jnt}'."); return
+        cmds.warning(f"Could not find a parent joint for '{child_jnt}'."); return None
     parent_jnt = parents[0]
     skin_cluster = find_skin_cluster(selection=[child_jnt])
     if not skin_cluster:
-        cmds.warning(f"Could not find a skinCluster for '{child_jnt}'."); return
+        cmds.warning(f"Could not find a skinCluster for '{child_jnt}'."); return None
     mesh_name_from_skin = cmds.listRelatives(cmds.skinCluster(skin_cluster, q=True, g=True)[0], p=True, f=True)[0]
-    mesh_name_from_selection = selected_verts[0].split('.')[0]
-    try:
-        unique_skin_mesh_path = cmds.ls(mesh_name_from_skin, long=True)[0]
-        unique_selection_mesh_path = cmds.ls(mesh_name_from_selection, long=True)[0]
-        if unique_skin_mesh_path != unique_selection_mesh_path:
-            cmds.warning("Selection Mismatch: Your vertices and Paint Tool are on different meshes."); return
-    except IndexError:
-        cmds.warning("Could not resolve mesh names for validation."); return
-    parent_pos = om.MPoint(cmds.xform(parent_jnt, q=True, ws=True, t=True))
-    child_pos = om.MPoint(cmds.xform(child_jnt, q=True, ws=True, t=True))
+    if selection_mesh:
+        try:
+            unique_skin_mesh_path = cmds.ls(mesh_name_from_skin, long=True)[0]
+            unique_selection_mesh_path = cmds.ls(selection_mesh, long=True)[0]
+            if unique_skin_mesh_path != unique_selection_mesh_path:
+                cmds.warning("Selection Mismatch: Your vertices and Paint Tool are on different meshes."); return None
+        except IndexError:
+            cmds.warning("Could not resolve mesh names for validation."); return None
     grandchildren = cmds.listRelatives(child_jnt, c=True, type="joint", f=True)
     if not grandchildren:
-        cmds.warning(f"'{child_jnt}' has no child joint to define capsule end."); return
-    grandchild_pos = om.MPoint(cmds.xform(grandchildren[0], q=True, ws=True, t=True))
-    weights_to_set = {}
-    for vtx in selected_verts:
-        vtx_pos = om.MPoint(cmds.xform(vtx, q=True, ws=True, t=True))
-        _, dist_parent = get_closest_point_on_segment(vtx_pos, parent_pos, child_pos)
-        _, dist_child = get_closest_point_on_segment(vtx_pos, child_pos, grandchild_pos)
-        in_parent = dist_parent < radius; in_child = dist_child < radius
-        tv = []
-        if in_parent and in_child:
-            total_dist = dist_parent + dist_child
-            if total_dist > 0.001:
-                ratio = dist_parent / total_dist
-                smoothed_ratio = pow(ratio, falloff)
-                tv = [(parent_jnt, 1.0 - smoothed_ratio), (child_jnt, smoothed_ratio)]
-        elif in_parent: tv = [(parent_jnt, 1.0), (child_jnt, 0.0)]
-        elif in_child: tv = [(parent_jnt, 0.0), (child_jnt, 1.0)]
-        if tv: weights_to_set[vtx] = tv
-    if not weights_to_set:
-        cmds.warning("None of the selected vertices were within the capsule radius."); return
-    _apply_weights_with_progress(skin_cluster, weights_to_set, "Localized Capsule", [parent_jnt, child_jnt])
-
-def get_closest_point_on_segment(point, seg_start, seg_end):
-    segment_vec = seg_end - seg_start
-    point_vec = point - seg_start
-    segment_len_sq = segment_vec.length() ** 2
-    if segment_len_sq == 0: return seg_start, (point - seg_start).length()
-    t = (point_vec * segment_vec) / segment_len_sq
-    t = max(0.0, min(1.0, t))
-    closest_point = seg_start + (segment_vec * t)
-    distance = (point - closest_point).length()
-    return closest_point, distance
-
-def _apply_weights_with_progress(skin_cluster, weights_to_set, method_name, relevant_joints, apply_weights=True):
-    cmds.undoInfo(openChunk=True)
-    progress_window = None
+        cmds.warning(f"'{child_jnt}' has no child joint to define capsule end."); return None
+    return {"skin_cluster": skin_cluster, "mesh": mesh_name_from_skin, "selected_ids": selected_ids,
+            "joints": (parent_jnt, child_jnt, grandchildren[0])}
+
+def _joint_positions(joints):
+    return tuple(cmds.xform(jnt, q=True, ws=True, t=True) for jnt in joints)
+
+@BlndWghtProfile.profiled()
+def apply_localized_capsule_blend(radius, falloff, progress=None):
+    """
+    Capsule blend between the Paint Tool joint and its parent. Works on the
+    selected vertices, or on the whole skinned mesh when no vertex is selected.
+    Returns the vertex ids that were changed.
+    """
+    setup = _resolve_capsule_setup()
+    if not setup: return
+    parent_jnt, child_jnt, _ = setup["joints"]
+    parent_pos, child_pos, grandchild_pos = _joint_positions(setup["joints"])
+    points = get_mesh_points(setup["mesh"])
+    vertex_ids = capsule_candidates(setup["mesh"], points, [(parent_pos, child_pos), (child_pos, grandchild_pos)], radius, setup["selected_ids"])
+    with BlndWghtProfile.phase("solve", vertices=len(vertex_ids)):
+        parent_w, child_w, valid = BlndWghtKernel.capsule_blend_weights(points[vertex_ids], parent_pos, child_pos, grandchild_pos, radius, falloff)
+    if not valid.any():
+        cmds.warning("No vertices were within the capsule radius."); return
+    hit_ids = vertex_ids[valid]
+    edits = [(hit_ids, parent_jnt, parent_w[valid]), (hit_ids, child_jnt, child_w[valid])]
+    return _commit_blend_weights(setup["skin_cluster"], edits, "Localized Capsule", [parent_jnt, child_jnt], progress)
+
+# ============================================================
+# LIVE CAPSULE PREVIEW
+# ============================================================
+PREVIEW_COLOR_SET = "blendWeightHelperPreview"
+PREVIEW_PARENT_COLOR = np.array([0.15, 0.35, 1.0, 1.0])
+PREVIEW_CHILD_COLOR = np.array([1.0, 0.2, 0.1, 1.0])
+PREVIEW_OUTSIDE_COLOR = np.array([0.35, 0.35, 0.35, 1.0])
+
+class CapsulePreview(object):
+    """
+    Live radius/falloff preview for the localized capsule blend. The bone
+    distances are solved once per selection and pose; every update only reruns
+    the cheap radius test and pow(ratio, falloff) mapping and shows the child
+    weight as vertex colours (parent blue -> child red, grey outside). Nothing is
+    written to the skinCluster until commit().
+    """
+    def __init__(self):
+        self.setup = None; self.vertex_ids = None; self.distances = None
+        self.joint_positions = None; self.color_state = None
+
+    @property
+    def active(self):
+        return self.setup is not None
+
+    @BlndWghtProfile.profiled("capsule_preview_start")
+    def start(self):
+        """Solves the distances for the current selection and pose; False when the setup is incomplete."""
+        self.stop()
+        setup = _resolve_capsule_setup()
+        if not setup: return False
+        points = get_mesh_points(setup["mesh"])
+        vertex_ids = setup["selected_ids"] if len(setup["selected_ids"]) else np.arange(len(points))
+        joint_positions = _joint_positions(setup["joints"])
+        with BlndWghtProfile.phase("distances", vertices=len(vertex_ids)):
+            self.distances = BlndWghtKernel.capsule_distances(points[vertex_ids], *joint_positions)
+        self.setup = setup; self.vertex_ids = vertex_ids; self.joint_positions = joint_positions
+        self.color_state = _show_preview_color_set(setup["mesh"])
+        return True
+
+    def _weights(self, radius, falloff):
+        # A moved joint needs a new solve; when that fails start() has already stopped the preview.
+        if _joint_positions(self.setup["joints"]) != self.joint_positions and not self.start(): return None
+        return BlndWghtKernel.capsule_weights_from_distances(self.distances[0], self.distances[1], radius, falloff)
+
+    @BlndWghtProfile.profiled("capsule_preview_update")
+    def update(self, radius, falloff):
+        """Recolours the preview; False when it is not running (any more)."""
+        if not self.active: return False
+        weights = self._weights(radius, falloff)
+        if weights is None: return False
+        _, child_w, valid = weights
+        colors = PREVIEW_PARENT_COLOR + child_w[:, None] * (PREVIEW_CHILD_COLOR - PREVIEW_PARENT_COLOR)
+        colors[~valid] = PREVIEW_OUTSIDE_COLOR
+        fn_mesh = om.MFnMesh(_get_dag_path(_get_mesh_shape(self.setup["mesh"])))
+        fn_mesh.setVertexColors(om.MColorArray(colors.tolist()), om.MIntArray(self.vertex_ids.tolist()))
+        return True
+
+    @BlndWghtProfile.profiled("capsule_preview_commit")
+    def commit(self, radius, falloff, progress=None):
+        """Writes the previewed weights through the normal bulk path, ends the preview and returns the changed ids."""
+        if not self.active: return None
+        weights = self._weights(radius, falloff)
+        if weights is None: return None
+        parent_w, child_w, valid = weights
+        setup = self.setup; hit_ids = self.vertex_ids[valid]
+        self.stop()
+        if not len(hit_ids):
+            cmds.warning("No vertices were within the capsule radius."); return
+        parent_jnt, child_jnt, _ = setup["joints"]
+        edits = [(hit_ids, parent_jnt, parent_w[valid]), (hit_ids, child_jnt, child_w[valid])]
+        return _commit_blend_weights(setup["skin_cluster"], edits, "Localized Capsule", [parent_jnt, child_jnt], progress)
+
+    def stop(self):
+        if self.color_state: _restore_color_set(self.color_state)
+        self.setup = None; self.vertex_ids = None; self.distances = None; self.color_state = None
+
+def _show_preview_color_set(mesh):
+    # The colour set is scratch display state, so keep it out of the undo queue.
+    shape = _get_mesh_shape(mesh)
+    state = {"shape": shape, "current": (cmds.polyColorSet(shape, q=True, currentColorSet=True) or [None])[0],
+             "display": cmds.getAttr(f"{shape}.displayColors")}
+    cmds.undoInfo(stateWithoutFlush=False)
+    try:
+        if PREVIEW_COLOR_SET not in (cmds.polyColorSet(shape, q=True, allColorSets=True) or []):
+            cmds.polyColorSet(shape, create=True, colorSet=PREVIEW_COLOR_SET, representation="RGBA")
+        cmds.polyColorSet(shape, currentColorSet=True, colorSet=PREVIEW_COLOR_SET)
+        cmds.setAttr(f"{shape}.displayColors", True)
+    finally:
+        cmds.undoInfo(stateWithoutFlush=True)
+    return state
+
+def _restore_color_set(state):
+    shape = state["shape"]
+    if not cmds.objExists(shape): return
+    cmds.undoInfo(stateWithoutFlush=False)
+    try:
+        if state["current"]: cmds.polyColorSet(shape, currentColorSet=True, colorSet=state["current"])
+        if PREVIEW_COLOR_SET in (cmds.polyColorSet(shape, q=True, allColorSets=True) or []):
+            cmds.polyColorSet(shape, delete=True, colorSet=PREVIEW_COLOR_SET)
+        cmds.setAttr(f"{shape}.displayColors", state["display"])
+    finally:
+        cmds.undoInfo(stateWithoutFlush=True)
+
+def _collect_joint_chains(joints):
+    """
+    Capsule triples (parent, child, grandchild) for the given joints, grouped into
+    independent chains that start below each branching joint (spine, arms, legs...).
+    A single root joint stands for its whole skeleton.
+    """
+    joints = cmds.ls(joints, long=True, type="joint") or []
+    if len(joints) == 1: joints += cmds.listRelatives(joints[0], ad=True, type="joint", f=True) or []
+    chains = {}
+    for child_jnt in dict.fromkeys(joints):
+        parents = cmds.listRelatives(child_jnt, p=True, type="joint", f=True)
+        grandchildren = cmds.listRelatives(child_jnt, c=True, type="joint", f=True)
+        if not parents or not grandchildren: continue
+        chain_root = child_jnt
+        while True:
+            above = cmds.listRelatives(chain_root, p=True, type="joint", f=True)
+            if not above or len(cmds.listRelatives(above[0], c=True, type="joint") or []) > 1: break
+            chain_root = above[0]
+        chains.setdefault(chain_root, []).append((parents[0], child_jnt, grandchildren[0]))
+    return list(chains.values())
+
+@BlndWghtProfile.profiled()
+def apply_batch_capsule_blend(radius, falloff, joints=None, max_workers=None, progress=None):
+    """
+    Capsule blend for every joint segment of a skeleton (a selected root joint)
+    or of a list of joints in one pass. Chains are solved in parallel, every
+    vertex takes the segment of its nearest joint and the merged result is
+    written once.
+    Selected vertices limit the blend, otherwise the whole mesh is used.
+    Returns the vertex ids that were changed.
+    """
+    if joints is None: joints = cmds.ls(sl=True, type="joint", long=True)
+    chains = _collect_joint_chains(joints)
+    if not chains:
+        cmds.warning("Please select a root joint or several joints with parent and child joints."); return
+    mesh, vertex_ids = get_selected_vertices()
+    skin_cluster = find_skin_cluster(selection=[mesh] if mesh else [chains[0][0][1]])
+    if not skin_cluster:
+        cmds.warning("Could not find a skinCluster for the selected joints."); return
+    _, index_by_name = get_influence_table(skin_cluster)
+    chains = [[seg for seg in chain if seg[0] in index_by_name and seg[1] in index_by_name] for chain in chains]
+    segments = [seg for chain in chains for seg in chain]
+    if not segments:
+        cmds.warning(f"None of the selected joints are influences of '{skin_cluster}'."); return
+    if not mesh: mesh = _get_skin_geometry(skin_cluster)
+    points = get_mesh_points(mesh)
+    joint_pos = {jnt: cmds.xform(jnt, q=True, ws=True, t=True) for seg in segments for jnt in seg}
+    bones = [(joint_pos[jnt_a], joint_pos[jnt_b]) for seg in segments for jnt_a, jnt_b in zip(seg, seg[1:])]
+    vertex_ids = capsule_candidates(mesh, points, bones, radius, vertex_ids)
+    chain_positions = [[tuple(joint_pos[jnt] for jnt in seg) for seg in chain] for chain in chains if chain]
+    with BlndWghtProfile.phase("solve_chains", vertices=len(vertex_ids), influences=len(segments) + 1):
+        best, parent_w, child_w, _ = BlndWghtKernel.solve_capsule_chains(points[vertex_ids], chain_positions, radius, falloff, max_workers)
+    edits = []
+    for i, (parent_jnt, child_jnt, _) in enumerate(segments):
+        hit = best == i
+        if hit.any(): edits += [(vertex_ids[hit], parent_jnt, parent_w[hit]), (vertex_ids[hit], child_jnt, child_w[hit])]
+    if not edits:
+        cmds.warning("No vertices were within the capsule radius of the selected joints."); return
+    return _commit_blend_weights(skin_cluster, edits, f"Batch Capsule ({len(segments)} segments)", [], progress)
+
+def _report_cancelled(method_name):
+    cmds.inViewMessage(amg=f"{method_name} cancelled, weights restored.", pos="midCenter", fade=True)
+
+def _commit_blend_weights(skin_cluster, edits, method_name, relevant_joints, progress=None):
     try:
-        if apply_weights:
-            progress_window = cmds.window(title=f"Applying {method_name}", width=300)
-            cmds.columnLayout(adj=True); progress_bar = cmds.progressBar(maxValue=len(weights_to_set), width=300); cmds.showWindow(progress_window)
-        all_verts = list(weights_to_set.keys())
-        all_influences = cmds.skinCluster(skin_cluster, q=True, influence=True)
-        influences_to_prune = [inf for inf in all_influences if inf not in relevant_joints]
-        if influences_to_prune and all_verts:
-            prune_weights_list = [(inf, 0.0) for inf in influences_to_prune]
-            cmds.skinPercent(skin_cluster, all_verts, transformValue=prune_weights_list, normalize=False)
-        if apply_weights:
-            for vtx, tv in weights_to_set.items():
-                if progress_window and cmds.progressBar(progress_bar, q=True, isCancelled=True): break
-                if tv: cmds.skinPercent(skin_cluster, vtx, transformValue=tv, normalize=False)
-                if progress_window: cmds.progressBar(progress_bar, e=True, step=1)
-            if all_verts: cmds.skinCluster(skin_cluster, e=True, normalizeWeights=True, geometry=all_verts)
+        written = commit_weight_edits(skin_cluster, edits, relevant_influences=relevant_joints, progress=progress)
+        if written is None: _report_cancelled(method_name); return None
+        cmds.inViewMessage(amg=f"Applied {method_name} to {len(written)} vertices.", pos="midCenter", fade=True)
+        return written
     except Exception as e:
         cmds.warning(f"Error during weight application: {e}")
     finally:
-        if progress_window and cmds.window(progress_window, exists=True): cmds.deleteUI(progress_window, window=True)
-        cmds.undoInfo(closeChunk=True)
-        if apply_weights: cmds.inViewMessage(amg=f"Applied {method_name} to {len(weights_to_set)} vertices.", pos="midCenter", fade=True)
         cmds.refresh(f=True)
 
 # ============================================================
 # FINAL SIMPLE BLEND FUNCTION
 # ============================================================
-def apply_simple_blend():
-    """
-    Applies a 3-step weight blend (0.8, 0.5, 0.2) based on a central
-    selected vertex loop and the active joint in the Paint Tool.
-    """
-    # 1. Get user's vertex selection and validate
-    selection = cmds.ls(sl=True, fl=True)
-    is_edge = cmds.filterExpand(selection, sm=32)
-    is_vertex = cmds.filterExpand(selection, sm=31)
-    if is_edge:
-        cmds.select(selection, r=True); mel.eval("polySelectSp -loop;")
-        center_loop_edges = cmds.ls(sl=True, fl=True)
-    elif is_vertex:
-        center_loop_edges = cmds.ls(cmds.polyListComponentConversion(selection, toEdge=True, internal=True), fl=True)
-    else:
-        cmds.warning("Please select a central vertex or edge loop."); return
-        
+@BlndWghtProfile.profiled()
+def apply_simple_blend(rings=1, progress=None):
+    """
+    Applies a stepped weight blend around a central vertex or edge loop and the
+    active joint in the Paint Tool. The centre loop gets 0.5/0.5 and `rings`
+    loops on each side step out to 0.8 (one ring gives the classic 0.8, 0.5, 0.2).
+    Returns the vertex ids that were changed.
+    """
+    # 1. Get user's vertex / edge selection and validate
+    mesh, center_loop = get_selected_vertices()
+    if not len(center_loop):
+        mesh, edge_pairs = get_selected_edges()
+        if not len(edge_pairs):
+            cmds.warning("Please select a central vertex or edge loop."); return
+        center_loop = get_mesh_topology(mesh).edge_loop_vertices(edge_pairs)
+
     # 2. Get context and joints from Paint Tool
     ctx = cmds.currentCtx()
     if not ctx.startswith('artAttrSkin'):
@@ -124,80 +285,153 @@ def apply_simple_blend():
     if not parents:
         cmds.warning(f"Could not find a parent joint for '{child_jnt}'."); return
     parent_jnt = parents[0]
-    
+
     # 3. Get skinCluster and other info
-    skin_cluster = find_skin_cluster(selection=selection)
+    skin_cluster = find_skin_cluster(selection=[mesh])
     if not skin_cluster:
         cmds.warning("No skinCluster found on selection."); return
-    
-    cmds.undoInfo(openChunk=True)
-    original_selection = cmds.ls(sl=True, long=True)
+
     try:
-        # 4. Find the 3 loops (center, and two adjacent)
-        set_loop_c = set(center_loop_edges)
-        loop_a_edges, loop_b_edges = _get_adjacent_edge_loops(center_loop_edges)
-
-        if not (loop_a_edges and loop_b_edges):
-            cmds.warning("Could not find two adjacent loops. Please select a loop away from mesh borders."); return
-            
-        # Determine which loop is parent-side vs child-side
-        parent_jnt_pos = om.MVector(*cmds.xform(parent_jnt, q=True, ws=True, t=True))
-        loop_a_center_vtx = cmds.ls(cmds.polyListComponentConversion(loop_a_edges[0], toVertex=True), fl=True)[0]
-        loop_b_center_vtx = cmds.ls(cmds.polyListComponentConversion(loop_b_edges[0], toVertex=True), fl=True)[0]
-        loop_a_pos = om.MVector(*cmds.xform(loop_a_center_vtx, q=True, ws=True, t=True))
-        loop_b_pos = om.MVector(*cmds.xform(loop_b_center_vtx, q=True, ws=True, t=True))
-        
-        parent_side_loop, child_side_loop = (loop_a_edges, loop_b_edges) if (parent_jnt_pos - loop_a_pos).length() < (parent_jnt_pos - loop_b_pos).length() else (loop_b_edges, loop_a_edges)
-            
-        loops_vtx = [
-            cmds.ls(cmds.polyListComponentConversion(parent_side_loop, toVertex=True), fl=True),
-            cmds.ls(cmds.polyListComponentConversion(center_loop_edges, toVertex=True), fl=True),
-            cmds.ls(cmds.polyListComponentConversion(child_side_loop,  toVertex=True), fl=True)
-        ]
-        
-        weights = [
-            [(parent_jnt, 0.8), (child_jnt, 0.2)],
-            [(parent_jnt, 0.5), (child_jnt, 0.5)],
-            [(parent_jnt, 0.2), (child_jnt, 0.8)]
-        ]
-        
-        all_loop_verts = loops_vtx[0] + loops_vtx[1] + loops_vtx[2]
-        
-        # 5. Prune unrelated influences for a clean result
-        all_influences = cmds.skinCluster(skin_cluster, q=True, influence=True)
-        relevant_influences = {parent_jnt, child_jnt}
-        influences_to_prune = [inf for inf in all_influences if inf not in relevant_influences]
-        
-        if influences_to_prune:
-            prune_weights_list = [(inf, 0.0) for inf in influences_to_prune]
-            cmds.skinPercent(skin_cluster, all_loop_verts, transformValue=prune_weights_list, normalize=False)
-
-        # 6. Apply the clean, stepped weights
-        for i, loop in enumerate(loops_vtx):
-            if loop:
-                cmds.skinPercent(skin_cluster, loop, transformValue=weights[i], normalize=True)
-        
-        cmds.inViewMessage(amg=f"Applied 3-Step Simple Blend.", pos="midCenter", fade=True)
+        # 4. Walk the rings on both sides of the centre loop on the cached topology
+        topology = get_mesh_topology(mesh)
+        with BlndWghtProfile.phase("walk_rings", vertices=len(center_loop)):
+            side_rings = topology.side_rings(center_loop, rings)
+        if not side_rings:
+            cmds.warning(f"Could not find {rings} adjacent loop(s) on both sides. Please select a loop away from mesh borders."); return
+
+        # Determine which side is parent-side vs child-side
+        points = get_mesh_points(mesh)
+        parent_jnt_pos = np.array(cmds.xform(parent_jnt, q=True, ws=True, t=True))
+        side_a, side_b = side_rings
+        dist_a = np.linalg.norm(points[side_a[0]].mean(axis=0) - parent_jnt_pos)
+        dist_b = np.linalg.norm(points[side_b[0]].mean(axis=0) - parent_jnt_pos)
+        parent_side, child_side = (side_a, side_b) if dist_a < dist_b else (side_b, side_a)
+
+        # 5. Step the child weight from 0.2 on the outer parent-side ring to 0.8 on the outer child-side ring
+        loops = parent_side[::-1] + [center_loop] + child_side
+        edits = []
+        for step, loop in zip(range(-rings, rings + 1), loops):
+            child_weight = 0.5 + 0.3 * step / rings
+            edits += [(loop, parent_jnt, 1.0 - child_weight), (loop, child_jnt, child_weight)]
+
+        # 6. Prune unrelated influences and apply the stepped weights in one write
+        written = commit_weight_edits(skin_cluster, edits, relevant_influences=[parent_jnt, child_jnt], progress=progress)
+        if written is None: _report_cancelled("Simple Blend"); return None
+        cmds.inViewMessage(amg=f"Applied {2 * rings + 1}-Step Simple Blend.", pos="midCenter", fade=True)
+        return written
 
     except Exception as e:
         cmds.warning(f"Simple Blend failed: {e}")
     finally:
-        cmds.select(original_selection, r=True)
-        cmds.undoInfo(closeChunk=True)
+        cmds.refresh(f=True)
+
+# ============================================================
+# SMOOTH WEIGHTS
+# ============================================================
+@BlndWghtProfile.profiled()
+def apply_smooth_weights(iterations=5, strength=0.5, progress=None):
+    """
+    Relaxes the weights of the selected vertices towards their neighbours with
+    Jacobi iterations over the cached mesh adjacency. The one-ring around the
+    selection is read but never written, so the result blends into the weights
+    outside. Returns the vertex ids that were changed.
+    """
+    mesh, vertex_ids = get_selected_vertices()
+    if not len(vertex_ids):
+        cmds.warning("Please select the vertices to smooth."); return None
+    skin_cluster = find_skin_cluster(selection=[mesh])
+    if not skin_cluster:
+        cmds.warning("No skinCluster found on selection."); return None
+    try:
+        region, free_rows, indptr, indices = get_mesh_topology(mesh).smoothing_region(vertex_ids)
+        region, block = read_weight_block(skin_cluster, region)
+        # Influences with no weight anywhere in the region stay zero, so leave them out.
+        columns = np.flatnonzero(block.any(axis=0))
+        with BlndWghtProfile.phase("smooth", vertices=len(free_rows), influences=len(columns)):
+            block = BlndWghtKernel.smooth_weight_block(block[:, columns], free_rows, indptr, indices, iterations, strength)
+        if not write_weight_block(skin_cluster, region[free_rows], block[free_rows], influence_indices=columns, progress=progress):
+            _report_cancelled("Smooth"); return None
+        cmds.inViewMessage(amg=f"Smoothed {len(free_rows)} vertices ({iterations} iterations).", pos="midCenter", fade=True)
+        return region[free_rows]
+    except Exception as e:
+        cmds.warning(f"Smooth failed: {e}")
+    finally:
         cmds.refresh(f=True)
 
 # ============================================================
 # CORE & HELPER FUNCTIONS
 # ============================================================
+class SkinClusterCache(object):
+    """
+    Session-level mesh/joint -> skinCluster -> influence table lookups. The whole
+    cache is dropped whenever a skinCluster is added or removed, a skinCluster
+    connection changes or a node is renamed, so entries never outlive the scene
+    state they were read from.
+    """
+    def __init__(self):
+        self.skin_by_node = {}; self.influence_tables = {}
+        self.hits = 0; self.misses = 0; self.invalidations = 0
+        self.callback_ids = []
+
+    def clear(self, *args):
+        if self.skin_by_node or self.influence_tables: self.invalidations += 1
+        self.skin_by_node.clear(); self.influence_tables.clear()
+
+    def _on_connection(self, src_plug, dst_plug, made, *args):
+        if src_plug.node().hasFn(om.MFn.kSkinClusterFilter) or dst_plug.node().hasFn(om.MFn.kSkinClusterFilter): self.clear()
+
+    def install_callbacks(self):
+        if self.callback_ids: return
+        self.callback_ids = [
+            om.MDGMessage.addNodeAddedCallback(self.clear, "skinCluster"),
+            om.MDGMessage.addNodeRemovedCallback(self.clear, "skinCluster"),
+            om.MDGMessage.addNodeRemovedCallback(self.clear, "joint"),
+            om.MDGMessage.addConnectionCallback(self._on_connection),
+            om.MNodeMessage.addNameChangedCallback(om.MObject(), self.clear),
+        ]
+
+    def remove_callbacks(self):
+        for callback_id in self.callback_ids: remove_callback(callback_id)
+        self.callback_ids = []
+
+    def _lookup(self, table, key, build):
+        self.install_callbacks()
+        if key in table: self.hits += 1; return table[key]
+        self.misses += 1
+        value = build(key)
+        if value is not None: table[key] = value
+        return value
+
+    def skin_cluster(self, node):
+        return self._lookup(self.skin_by_node, node, _lookup_skin_cluster)
+
+    def influence_table(self, skin_cluster):
+        return self._lookup(self.influence_tables, skin_cluster, _build_influence_table)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "invalidations": self.invalidations,
+                "nodes": len(self.skin_by_node), "skin_clusters": len(self.influence_tables)}
+
+_skin_cache = SkinClusterCache()
+
+def skin_cluster_cache_stats():
+    """Hit/miss counters of the skinCluster cache, e.g. to check it is being used."""
+    return _skin_cache.stats()
+
+def clear_skin_cluster_cache():
+    _skin_cache.clear()
+
 def find_skin_cluster(selection=None):
     if not selection: 
         selection = cmds.ls(sl=True, long=True)
     if not selection: return None
-    node = selection[0]
+    return _skin_cache.skin_cluster(selection[0].split('.')[0])
+
+def _lookup_skin_cluster(node):
     if cmds.nodeType(node) == 'joint':
         skin_clusters = cmds.listConnections(node, type='skinCluster')
         if skin_clusters: return list(set(skin_clusters))[0]
-    mesh_name = node.split('.')[0]
+    mesh_name = node
     shapes = cmds.listRelatives(mesh_name, s=True, ni=True, f=True)
     if shapes:
         for shape in shapes:
@@ -209,40 +443,273 @@ def find_skin_cluster(selection=None):
         if skin_clusters: return skin_clusters[0]
     return None
 
-def _get_adjacent_edge_loops(edge_loop):
-    faces = cmds.ls(cmds.polyListComponentConversion(edge_loop, fromEdge=True, toFace=True), fl=True)
-    if not faces: return None, None
-    border_edges = cmds.ls(cmds.polyListComponentConversion(faces, fromFace=True, toEdge=True, border=True), fl=True)
-    if not border_edges: return None, None
-    cmds.select(border_edges[0], r=True)
-    mel.eval("polySelectSp -loop;")
-    loop_a = cmds.ls(sl=True, fl=True)
-    loop_b_list = list(set(border_edges) - set(loop_a))
-    loop_b = loop_b_list if loop_b_list else None
-    original_selection = cmds.ls(sl=True, long=True) # Save selection before returning
-    try:
-        cmds.select(edge_loop) # Restore selection
-    except:
-        pass # Handle cases where original selection might be gone
-    return loop_a, loop_b
+def _get_mesh_shape(mesh_name):
+    if cmds.nodeType(mesh_name) == 'mesh': return mesh_name
+    shapes = cmds.listRelatives(mesh_name, s=True, ni=True, f=True, type='mesh')
+    return shapes[0] if shapes else None
+
+def _get_dag_path(node):
+    sel = om.MSelectionList(); sel.add(node)
+    return sel.getDagPath(0)
+
+def get_mesh_points(mesh_name):
+    """World-space positions of every vertex of the mesh as an (N,3) array, read in one call."""
+    shape = _get_mesh_shape(mesh_name)
+    if not shape: raise RuntimeError(f"'{mesh_name}' is not a polygon mesh.")
+    with BlndWghtProfile.phase("read_positions") as record:
+        points = om.MFnMesh(_get_dag_path(shape)).getPoints(om.MSpace.kWorld)
+        points = np.array(points, dtype=np.float64).reshape(-1, 4)[:, :3]
+        record["vertices"] = len(points)
+    return points
+
+_grid_cache = {}
+
+def get_vertex_grid(mesh_name, points, cell_size):
+    """
+    VertexGrid over the mesh's current positions, cached per mesh and reused until
+    the pose changes or the query radius no longer suits its cell size.
+    """
+    grid = _grid_cache.get(mesh_name)
+    if grid is None or not grid.matches(points, cell_size):
+        grid = _grid_cache[mesh_name] = BlndWghtKernel.VertexGrid(points, cell_size)
+    return grid
+
+def capsule_candidates(mesh_name, points, bones, radius, vertex_ids=None):
+    """Vertex ids within radius of any (start, end) bone, limited to vertex_ids when any are given."""
+    with BlndWghtProfile.phase("spatial_query", vertices=len(points)) as record:
+        hits = get_vertex_grid(mesh_name, points, radius).query_capsules(bones, radius)
+        record["vertices"] = len(hits)
+    if vertex_ids is not None and len(vertex_ids): hits = np.intersect1d(hits, vertex_ids)
+    return hits
+
+_VTX_INDEX_RE = re.compile(r"\.vtx\[(\d+)\]$")
+
+def _vertex_ids(vertex_names):
+    """Vertex indices of flattened 'mesh.vtx[i]' names, in the same order."""
+    return np.array([int(_VTX_INDEX_RE.search(vtx).group(1)) for vtx in vertex_names], dtype=np.int64)
+
+_topology_cache = {}
+
+def _mark_topology_dirty(shape_path, *args):
+    # Only flag it here; the callback is removed on the next lookup, outside its own call.
+    entry = _topology_cache.get(shape_path)
+    if entry: entry["dirty"] = True
+
+def get_mesh_topology(mesh_name):
+    """
+    Cached MeshTopology of a mesh, built from one MFnMesh.getVertices call and
+    invalidated by a topology-changed callback on the shape.
+    """
+    shape = _get_mesh_shape(mesh_name)
+    if not shape: raise RuntimeError(f"'{mesh_name}' is not a polygon mesh.")
+    dag = _get_dag_path(shape); shape_path = dag.fullPathName()
+    fn_mesh = om.MFnMesh(dag)
+    entry = _topology_cache.get(shape_path)
+    if entry and not entry["dirty"] and entry["topology"].num_vertices == fn_mesh.numVertices and entry["topology"].num_faces == fn_mesh.numPolygons:
+        return entry["topology"]
+    if entry: remove_callback(entry["callback_id"])
+    with BlndWghtProfile.phase("build_topology", vertices=fn_mesh.numVertices):
+        face_counts, face_connects = fn_mesh.getVertices()
+        topology = BlndWghtTopology.MeshTopology(fn_mesh.numVertices, face_counts, face_connects)
+    callback_id = om.MPolyMessage.addPolyTopologyChangedCallback(dag.node(), partial(_mark_topology_dirty, shape_path))
+    _topology_cache[shape_path] = {"topology": topology, "callback_id": callback_id, "dirty": False}
+    return topology
+
+def release_caches():
+    """Drops every session cache and removes its Maya callbacks, e.g. before a developer reload."""
+    _skin_cache.remove_callbacks(); _skin_cache.clear()
+    for entry in _topology_cache.values(): remove_callback(entry["callback_id"])
+    _topology_cache.clear(); _grid_cache.clear()
+
+# ============================================================
+# BULK WEIGHT READ / WRITE
+# ============================================================
+def _get_skin_fn(skin_cluster):
+    sel = om.MSelectionList(); sel.add(skin_cluster)
+    return oma.MFnSkinCluster(sel.getDependNode(0))
+
+def _get_skin_geometry(skin_cluster):
+    return cmds.skinCluster(skin_cluster, q=True, g=True)[0]
+
+def get_influence_table(skin_cluster):
+    """
+    Influence names of the skinCluster in weight-column order, plus a lookup
+    that resolves short, partial and long joint names to their column.
+    Served from the session skinCluster cache.
+    """
+    return _skin_cache.influence_table(skin_cluster)
+
+def _build_influence_table(skin_cluster):
+    influences = _get_skin_fn(skin_cluster).influenceObjects()
+    names = [path.partialPathName() for path in influences]
+    index_by_name = {}
+    for i, path in enumerate(influences):
+        index_by_name[path.fullPathName()] = i
+        index_by_name[path.partialPathName()] = i
+        index_by_name.setdefault(path.partialPathName().split('|')[-1], i)
+    return names, index_by_name
+
+def _influence_index(index_by_name, influence):
+    index = index_by_name.get(influence)
+    if index is None:
+        long_names = cmds.ls(influence, long=True)
+        if long_names: index = index_by_name.get(long_names[0])
+    if index is None: raise ValueError(f"'{influence}' is not an influence of this skinCluster.")
+    return index
+
+def _vertex_component(vertex_ids):
+    fn_comp = om.MFnSingleIndexedComponent()
+    comp = fn_comp.create(om.MFn.kMeshVertComponent)
+    fn_comp.addElements([int(i) for i in vertex_ids])
+    return comp
+
+def read_weight_block(skin_cluster, vertex_ids):
+    """
+    Dense weights of the given vertices with one MFnSkinCluster.getWeights call.
+    Returns (sorted unique vertex ids, (N, influences) float64 block).
+    """
+    vertex_ids = np.unique(np.asarray(vertex_ids, dtype=np.int64))
+    with BlndWghtProfile.phase("read_weights", vertices=len(vertex_ids)) as record:
+        weights, num_influences = _get_skin_fn(skin_cluster).getWeights(_get_dag_path(_get_skin_geometry(skin_cluster)), _vertex_component(vertex_ids))
+        record["influences"] = num_influences
+        return vertex_ids, np.array(weights, dtype=np.float64).reshape(len(vertex_ids), num_influences)
+
+_WEIGHT_COMMAND_PLUGIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "blendWeightHelperCmd.py")
+
+def _load_weight_command():
+    if not cmds.pluginInfo(_WEIGHT_COMMAND_PLUGIN, q=True, loaded=True):
+        cmds.loadPlugin(_WEIGHT_COMMAND_PLUGIN, quiet=True)
+
+WRITE_CHUNK_SIZE = 5000
+
+def write_weight_block(skin_cluster, vertex_ids, block, influence_indices=None, progress=None, chunk_size=WRITE_CHUNK_SIZE):
+    """
+    Commits a dense, fully computed block for sorted `vertex_ids` through the
+    undoable blendWeightHelperSetWeights command, so it is one undo step. The
+    block goes down in setWeights batches of chunk_size vertices and
+    progress(done, total) is called once per batch; when it returns False the
+    batches already written are rolled back. Returns False if cancelled.
+    """
+    block = np.asarray(block, dtype=np.float64)
+    if influence_indices is None: influence_indices = range(block.shape[1])
+    with BlndWghtProfile.phase("write_weights", vertices=len(block), influences=len(influence_indices)):
+        _load_weight_command()
+        payload = BlndWghtCmd.queue_weights(skin_cluster, _get_skin_geometry(skin_cluster), vertex_ids, influence_indices, block.ravel(), chunk_size, progress)
+        try: getattr(cmds, BlndWghtCmd.COMMAND_NAME)()
+        finally: BlndWghtCmd.discard_weights(payload)
+    return not payload["cancelled"]
+
+def commit_weight_edits(skin_cluster, edits, relevant_influences=None, normalize=True, progress=None):
+    """
+    Applies (vertex_ids, influence, weights) edits in one bulk write. Edited
+    entries are clamped and kept, other influences are pruned when
+    relevant_influences is given and the rest is normalized around them.
+    Returns the vertex ids that were written, or None if progress cancelled it.
+    """
+    names, index_by_name = get_influence_table(skin_cluster)
+    edit_ids, edit_columns, edit_values = [], [], []
+    for vertex_ids, influence, weights in edits:
+        vertex_ids = np.atleast_1d(np.asarray(vertex_ids, dtype=np.int64))
+        edit_ids.append(vertex_ids)
+        edit_columns.append(np.full(len(vertex_ids), _influence_index(index_by_name, influence), dtype=np.int64))
+        edit_values.append(np.broadcast_to(np.asarray(weights, dtype=np.float64), vertex_ids.shape))
+    if not edit_ids: return np.zeros(0, dtype=np.int64)
+    edit_ids = np.concatenate(edit_ids)
+    vertex_ids, block = read_weight_block(skin_cluster, edit_ids)
+    keep_columns = None
+    if relevant_influences is not None: keep_columns = [_influence_index(index_by_name, inf) for inf in relevant_influences]
+    with BlndWghtProfile.phase("prune_normalize", vertices=len(vertex_ids), influences=len(names)):
+        block = BlndWghtKernel.apply_weight_edits(block, np.searchsorted(vertex_ids, edit_ids), np.concatenate(edit_columns), np.concatenate(edit_values), keep_columns=keep_columns, normalize=normalize)
+    if not write_weight_block(skin_cluster, vertex_ids, block, progress=progress): return None
+    return vertex_ids
+
+def get_selected_vertices():
+    """
+    Vertex selection of the first mesh in the active selection, read through the
+    API without flattening component strings. Returns (mesh transform, int array).
+    """
+    sel = om.MGlobal.getActiveSelectionList()
+    for i in range(sel.length()):
+        try: dag, comp = sel.getComponent(i)
+        except RuntimeError: continue
+        if comp.isNull() or not comp.hasFn(om.MFn.kMeshVertComponent): continue
+        if dag.apiType() == om.MFn.kMesh: dag.pop()
+        return dag.partialPathName(), np.array(om.MFnSingleIndexedComponent(comp).getElements(), dtype=np.int64)
+    return None, np.zeros(0, dtype=np.int64)
+
+def get_selected_edges():
+    """Edge selection of the first mesh in the active selection as (mesh transform, (E,2) vertex pairs)."""
+    sel = om.MGlobal.getActiveSelectionList()
+    for i in range(sel.length()):
+        try: dag, comp = sel.getComponent(i)
+        except RuntimeError: continue
+        if comp.isNull() or not comp.hasFn(om.MFn.kMeshEdgeComponent): continue
+        fn_mesh = om.MFnMesh(dag)
+        pairs = np.array([fn_mesh.getEdgeVertices(e) for e in om.MFnSingleIndexedComponent(comp).getElements()], dtype=np.int64)
+        if dag.apiType() == om.MFn.kMesh: dag.pop()
+        return dag.partialPathName(), pairs
+    return None, np.zeros((0, 2), dtype=np.int64)
+
+def add_selection_changed_callback(callback):
+    """Registers callback for Maya's SelectionChanged event; returns the id for remove_callback."""
+    return om.MEventMessage.addEventCallback("SelectionChanged", callback)
+
+def remove_callback(callback_id):
+    try: om.MMessage.removeCallback(callback_id)
+    except RuntimeError: pass
+
+def iter_vertex_weights(skin_cluster, mesh, vertex_ids, chunk_size=20000, threshold=0.0001):
+    """Yields SparseWeights chunks of at most chunk_size vertices, one getWeights call each."""
+    names, _ = get_influence_table(skin_cluster)
+    vertex_ids = np.unique(np.asarray(vertex_ids, dtype=np.int64))
+    for start in range(0, len(vertex_ids), chunk_size):
+        chunk_ids, block = read_weight_block(skin_cluster, vertex_ids[start:start + chunk_size])
+        yield BlndWghtKernel.SparseWeights.from_dense(mesh, chunk_ids, block, names, threshold)
+
+def read_vertex_weights(skin_cluster, mesh, vertex_ids, threshold=0.0001):
+    """Sparse weights of the given vertices with a single getWeights call."""
+    return next(iter_vertex_weights(skin_cluster, mesh, vertex_ids, chunk_size=max(len(vertex_ids), 1), threshold=threshold), None)
+
+@BlndWghtProfile.profiled()
+def read_selection_weights(threshold=0.0001, chunk_size=None):
+    """
+    SparseWeights for the selected vertices, or None when there is nothing to read.
+    With chunk_size an iterator of chunks is returned instead, for very large selections.
+    """
+    mesh, vertex_ids = get_selected_vertices()
+    if not len(vertex_ids): return None
+    skin_cluster = find_skin_cluster(selection=[mesh])
+    if not skin_cluster: return None
+    if chunk_size: return iter_vertex_weights(skin_cluster, mesh, vertex_ids, chunk_size, threshold)
+    return read_vertex_weights(skin_cluster, mesh, vertex_ids, threshold)
+
+@BlndWghtProfile.profiled()
+def refresh_vertex_weights(weights, vertex_ids, threshold=0.0001):
+    """
+    Re-reads only the rows of `weights` whose vertices are in vertex_ids, e.g. the
+    ids an edit returned. All influences of those vertices are read again, so
+    normalization changes on other joints show up as well.
+    """
+    if weights is None or vertex_ids is None: return weights
+    vertex_ids = np.intersect1d(weights.vertex_ids, vertex_ids)
+    if not len(vertex_ids): return weights
+    skin_cluster = find_skin_cluster(selection=[weights.mesh])
+    if not skin_cluster: return weights
+    update = read_vertex_weights(skin_cluster, weights.mesh, vertex_ids, threshold)
+    if update.influence_names != weights.influence_names: return read_vertex_weights(skin_cluster, weights.mesh, weights.vertex_ids, threshold)
+    return weights.replace_rows(update)
 
 def get_vertex_weights_all():
-    sels = cmds.ls(sl=True, fl=True)
-    if not sels or not cmds.filterExpand(sels, sm=31): return []
-    skin_cluster = find_skin_cluster(selection=sels)
-    if not skin_cluster: return []
-    influences = cmds.skinCluster(skin_cluster, q=True, inf=True)
-    if not influences: return []
-    result = []
-    for vtx in sels:
-        weights = cmds.skinPercent(skin_cluster, vtx, q=True, value=True)
-        for i, weight_val in enumerate(weights):
-            if weight_val > 0.0001: result.append((vtx, influences[i], weight_val))
-    return result
+    weights = read_selection_weights()
+    if weights is None or not weights.influence_names: return []
+    return weights.as_tuples()
 
+@BlndWghtProfile.profiled()
 def apply_weight(weight_value):
+    """Sets the Paint Tool joint on the selected vertices; returns the changed vertex ids."""
     sels = cmds.ls(sl=True, fl=True)
-    if not cmds.filterExpand(sels, sm=31): cmds.warning("No vertex selected."); return
+    vertices = cmds.filterExpand(sels, sm=31)
+    if not vertices: cmds.warning("No vertex selected."); return
     skin_cluster = find_skin_cluster(selection=sels)
     if not skin_cluster: cmds.warning("No skinCluster found on selection."); return
     ctx = cmds.currentCtx()
@@ -255,7 +722,9 @@ def apply_weight(weight_value):
     try: cmds.skinPercent(skin_cluster, sels, tv=[(active_joint, weight_value)], normalize=True)
     finally: cmds.undoInfo(closeChunk=True)
     cmds.refresh(f=True)
+    return _vertex_ids(vertices)
 
+@BlndWghtProfile.profiled()
 def set_specific_vertex_weight(vertex, joint, weight_value):
     skin_cluster = find_skin_cluster(selection=[vertex])
     if not skin_cluster: return
@@ -264,31 +733,126 @@ def set_specific_vertex_weight(vertex, joint, weight_value):
     try: cmds.skinPercent(skin_cluster, vertex, tv=[(joint, weight_value)], normalize=True)
     finally: cmds.undoInfo(closeChunk=True)
     cmds.refresh(f=True)
+    return _vertex_ids([vertex])
     
-def set_multiple_vertex_weights(weight_data):
+@BlndWghtProfile.profiled()
+def set_multiple_vertex_weights(weight_data, progress=None):
+    """Writes (vertex, joint, weight) rows with one bulk call; returns the changed vertex ids."""
     if not weight_data: return
     skin_cluster = find_skin_cluster(selection=[weight_data[0][0]])
     if not skin_cluster: cmds.warning("Could not find a skinCluster for batch operation."); return
-    cmds.undoInfo(openChunk=True)
-    progress_window = None
     try:
-        progress_window = cmds.window(title="Batch Applying Weights", width=300)
-        cmds.columnLayout(adj=True); progress_bar = cmds.progressBar(maxValue=len(weight_data), width=300); cmds.showWindow(progress_window)
-        all_verts = []
-        for vtx, joint, weight in weight_data:
-            if cmds.progressBar(progress_bar, q=True, isCancelled=True): break
-            weight = max(0.0, min(1.0, weight))
-            cmds.skinPercent(skin_cluster, vtx, tv=[(joint, weight)], normalize=False)
-            all_verts.append(vtx)
-            cmds.progressBar(progress_bar, e=True, step=1)
-        if all_verts: cmds.skinCluster(skin_cluster, e=True, nw=True, geo=list(set(all_verts)))
-    except Exception as e: cmds.warning(f"Error during batch weight application: {e}")
-    finally:
-        if progress_window and cmds.window(progress_window, exists=True):
-            cmds.deleteUI(progress_window, window=True)
-        cmds.undoInfo(closeChunk=True)
+        edits = [(_vertex_ids([vtx]), joint, weight) for vtx, joint, weight in weight_data]
+        written = commit_weight_edits(skin_cluster, edits, progress=progress)
+        if written is None: _report_cancelled("Batch edit"); return None
         cmds.inViewMessage(amg=f"Batch updated {len(weight_data)} weights.", pos="midCenter", fade=True)
-        cmds.refresh(f=True)
+        return written
+    except Exception as e: cmds.warning(f"Error during batch weight application: {e}")
+    finally: cmds.refresh(f=True)
+
+# ============================================================
+# WEIGHT SNAPSHOTS
+# ============================================================
+def _get_target_mesh(mesh=None):
+    if mesh: return mesh
+    selection_mesh, _ = get_selected_vertices()
+    if selection_mesh: return selection_mesh
+    transforms = cmds.ls(sl=True, objectsOnly=True, long=True)
+    return transforms[0] if transforms else None
+
+@BlndWghtProfile.profiled()
+def export_skin_weights(path, mesh=None, dtype="float32", chunk_size=50000):
+    """Saves every vertex weight of the mesh (default: the selected one) to a .bwh snapshot."""
+    mesh = _get_target_mesh(mesh)
+    skin_cluster = find_skin_cluster(selection=[mesh]) if mesh else None
+    if not skin_cluster: cmds.warning("Select a skinned mesh to export its weights."); return None
+    num_vertices = om.MFnMesh(_get_dag_path(_get_mesh_shape(mesh))).numVertices
+    chunks = list(iter_vertex_weights(skin_cluster, mesh, np.arange(num_vertices), chunk_size, threshold=0.0))
+    weights = BlndWghtKernel.SparseWeights.concatenate(chunks)
+    BlndWghtIO.write_weights(path, weights, num_vertices, dtype)
+    cmds.inViewMessage(amg=f"Exported weights of {num_vertices} vertices.", pos="midCenter", fade=True)
+    return path
+
+@BlndWghtProfile.profiled()
+def import_skin_weights(path, mesh=None, progress=None, chunk_size=50000):
+    """
+    Loads a .bwh snapshot onto the mesh (default: the selected one). Influences are
+    remapped by name, ones missing from the skinCluster are dropped with a warning,
+    and all rows are written back with one bulk call. The file is mapped and
+    normalized chunk_size rows at a time straight into the write block.
+    Returns the written vertex ids.
+    """
+    mesh = _get_target_mesh(mesh)
+    skin_cluster = find_skin_cluster(selection=[mesh]) if mesh else None
+    if not skin_cluster: cmds.warning("Select a skinned mesh to import weights onto."); return None
+    weight_file = BlndWghtIO.WeightFile(path)
+    num_vertices = om.MFnMesh(_get_dag_path(_get_mesh_shape(mesh))).numVertices
+    if weight_file.header.num_vertices != num_vertices:
+        cmds.warning(f"Snapshot has {weight_file.header.num_vertices} vertices but '{mesh}' has {num_vertices}."); return None
+    if not len(weight_file): return None
+    names, index_by_name = get_influence_table(skin_cluster)
+    column_map = np.array([index_by_name.get(name, index_by_name.get(name.split('|')[-1], -1)) for name in weight_file.header.influence_names], dtype=np.int64)
+    missing = [name for name, column in zip(weight_file.header.influence_names, column_map) if column < 0]
+    block = np.zeros((len(weight_file), len(names)), dtype=np.float64)
+    vertex_ids = []; count = 0
+    for chunk in weight_file.iter_chunks(chunk_size):
+        rows, columns = chunk.entry_rows(), column_map[chunk.indices]
+        found = columns >= 0
+        # Vertices whose every influence is missing would be written as all zeros; leave them as they are.
+        mapped = np.bincount(rows[found], minlength=len(chunk)) > 0
+        target = block[count:count + np.count_nonzero(mapped)]
+        target[(np.cumsum(mapped) - 1)[rows[found]], columns[found]] = chunk.values[found]
+        target[:] = BlndWghtKernel.normalize_weight_block(target)
+        vertex_ids.append(chunk.vertex_ids[mapped]); count += len(target)
+    vertex_ids = np.concatenate(vertex_ids)
+    if missing:
+        cmds.warning(f"Skipping influences missing from '{skin_cluster}': {', '.join(missing)}"
+                     f" ({len(weight_file) - count} vertices with no remaining influence left untouched)")
+    if not count: return None
+    if not write_weight_block(skin_cluster, vertex_ids, block[:count], progress=progress):
+        _report_cancelled("Weight import"); return None
+    cmds.inViewMessage(amg=f"Imported weights for {count} vertices.", pos="midCenter", fade=True)
+    return vertex_ids
+
+# ============================================================
+# INFLUENCE LIMITS
+# ============================================================
+@BlndWghtProfile.profiled()
+def enforce_influence_limits(max_influences=4, min_weight=0.0, mesh=None, progress=None, chunk_size=20000):
+    """
+    Limits every vertex of the mesh (default: the selected one, or just the
+    selected vertices) to its max_influences largest weights, drops weights
+    below min_weight and renormalizes. Weights are read in chunks of chunk_size
+    vertices and only the vertices that changed are written, in one bulk call.
+    Returns the changed vertex ids.
+    """
+    selection_mesh, vertex_ids = get_selected_vertices()
+    if mesh or not selection_mesh: vertex_ids = np.zeros(0, dtype=np.int64)
+    mesh = _get_target_mesh(mesh)
+    skin_cluster = find_skin_cluster(selection=[mesh]) if mesh else None
+    if not skin_cluster: cmds.warning("Select a skinned mesh to enforce influence limits on."); return None
+    if not len(vertex_ids): vertex_ids = np.arange(om.MFnMesh(_get_dag_path(_get_mesh_shape(mesh))).numVertices)
+    names, _ = get_influence_table(skin_cluster)
+    changed_ids, changed_blocks = [], []
+    touched = np.zeros(len(names), dtype=bool)
+    with BlndWghtProfile.phase("prune", vertices=len(vertex_ids), influences=len(names)):
+        for start in range(0, len(vertex_ids), chunk_size):
+            chunk_ids, block = read_weight_block(skin_cluster, vertex_ids[start:start + chunk_size])
+            pruned, changed = BlndWghtKernel.prune_weight_block(block, max_influences, min_weight)
+            if not changed.any(): continue
+            touched |= block[changed].any(axis=0)
+            changed_ids.append(chunk_ids[changed]); changed_blocks.append(pruned[changed])
+    if not changed_ids:
+        cmds.inViewMessage(amg=f"All {len(vertex_ids)} vertices are within the limits.", pos="midCenter", fade=True)
+        return np.zeros(0, dtype=np.int64)
+    # Only influences that had weight on a changed vertex need writing.
+    columns = np.flatnonzero(touched)
+    changed_ids = np.concatenate(changed_ids)
+    block = np.concatenate(changed_blocks)[:, columns]
+    if not write_weight_block(skin_cluster, changed_ids, block, influence_indices=columns, progress=progress):
+        _report_cancelled("Influence limits"); return None
+    cmds.inViewMessage(amg=f"Limited {len(changed_ids)} of {len(vertex_ids)} vertices to {max_influences} influences.", pos="midCenter", fade=True)
+    return changed_ids
 
 def reset_selected_vertices():
     if not cmds.ls(sl=True): cmds.warning("Nothing to deselect."); return
@@ -0,0 +1,14 @@
+"""
+The tests cover the Maya-free modules (kernel, topology, snapshot IO), plus a
+few util helpers on the fake maya from benchmarks/, and run with plain pytest
+from the repo root:
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+import run_benchmarks
+
+run_benchmarks.load_package()
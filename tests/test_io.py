@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from BlendWeightHelperTool import blendWeightHelperIO as BlndWghtIO
+from BlendWeightHelperTool import blendWeightHelperKernel as BlndWghtKernel
+
+def _weights(num_rows=500, num_influences=12, seed=3):
+    rng = np.random.default_rng(seed)
+    block = rng.random((num_rows, num_influences)) ** 6
+    block /= block.sum(axis=1, keepdims=True)
+    vertex_ids = np.sort(rng.choice(num_rows * 4, num_rows, replace=False))
+    names = [f"|root|joint{i}" for i in range(num_influences)]
+    return BlndWghtKernel.SparseWeights.from_dense("|body", vertex_ids, block, names, threshold=0.01)
+
+@pytest.mark.parametrize("dtype, tolerance", [("float32", 1e-7), ("float16", 1e-3)])
+def test_round_trip(tmp_path, dtype, tolerance):
+    weights = _weights(); path = str(tmp_path / "weights.bwh")
+    BlndWghtIO.write_weights(path, weights, 2000, dtype)
+    weight_file = BlndWghtIO.WeightFile(path)
+    assert weight_file.header.num_vertices == 2000 and weight_file.header.dtype == np.dtype(dtype)
+    loaded = weight_file.read()
+    assert loaded.mesh == "|body" and loaded.influence_names == weights.influence_names
+    assert np.array_equal(loaded.vertex_ids, weights.vertex_ids)
+    assert np.array_equal(loaded.indptr, weights.indptr) and np.array_equal(loaded.indices, weights.indices)
+    assert np.allclose(loaded.values, weights.values, rtol=tolerance, atol=tolerance)
+
+def test_partial_reads_and_chunks(tmp_path):
+    weights = _weights(); path = str(tmp_path / "weights.bwh")
+    BlndWghtIO.write_weights(path, weights, 2000)
+    weight_file = BlndWghtIO.WeightFile(path)
+    dense = weights.to_dense()
+    part = weight_file.read(120, 260)
+    assert np.array_equal(part.vertex_ids, weights.vertex_ids[120:260])
+    assert np.allclose(part.to_dense(), dense[120:260])
+    assert len(weight_file.read(450, 10000)) == 50
+    chunks = list(weight_file.iter_chunks(128))
+    assert [len(chunk) for chunk in chunks] == [128, 128, 128, 116]
+    assert np.allclose(BlndWghtKernel.SparseWeights.concatenate(chunks).to_dense(), dense)
+
+def test_empty_matrix(tmp_path):
+    names = ["|root"]; path = str(tmp_path / "empty.bwh")
+    empty = BlndWghtKernel.SparseWeights.from_dense("|body", np.zeros(0, dtype=np.int64), np.zeros((0, 1)), names)
+    BlndWghtIO.write_weights(path, empty, 10)
+    weight_file = BlndWghtIO.WeightFile(path)
+    assert len(weight_file) == 0 and weight_file.header.nnz == 0
+    loaded = weight_file.read()
+    assert len(loaded) == 0 and loaded.nnz == 0 and loaded.influence_names == names
+    assert list(weight_file.iter_chunks(10)) == []
+
+def test_rejects_foreign_files(tmp_path):
+    path = tmp_path / "other.bwh"; path.write_bytes(b"not a snapshot at all, just some bytes here")
+    with pytest.raises(ValueError):
+        BlndWghtIO.read_header(str(path))
@@ -0,0 +1,131 @@
+import math
+
+import numpy as np
+import pytest
+
+from BlendWeightHelperTool import blendWeightHelperKernel as BlndWghtKernel
+
+def _segment_distance(point, seg_start, seg_end):
+    # Plain-Python point to segment distance.
+    segment_vec = [e - s for s, e in zip(seg_start, seg_end)]
+    point_vec = [p - s for s, p in zip(seg_start, point)]
+    segment_len_sq = sum(v * v for v in segment_vec)
+    if segment_len_sq == 0: return math.dist(point, seg_start)
+    t = max(0.0, min(1.0, sum(a * b for a, b in zip(point_vec, segment_vec)) / segment_len_sq))
+    return math.dist(point, [s + v * t for s, v in zip(seg_start, segment_vec)])
+
+def _capsule_reference(point, parent_pos, child_pos, grandchild_pos, radius, falloff):
+    # The per-vertex rules of the original apply_localized_capsule_blend; None = vertex skipped.
+    dist_parent = _segment_distance(point, parent_pos, child_pos)
+    dist_child = _segment_distance(point, child_pos, grandchild_pos)
+    in_parent = dist_parent < radius; in_child = dist_child < radius
+    if in_parent and in_child:
+        total_dist = dist_parent + dist_child
+        if total_dist > 0.001:
+            smoothed_ratio = pow(dist_parent / total_dist, falloff)
+            return 1.0 - smoothed_ratio, smoothed_ratio
+        return None
+    if in_parent: return 1.0, 0.0
+    if in_child: return 0.0, 1.0
+    return None
+
+def _region(point, parent_pos, child_pos, grandchild_pos, radius):
+    in_parent = _segment_distance(point, parent_pos, child_pos) < radius
+    in_child = _segment_distance(point, child_pos, grandchild_pos) < radius
+    return {(True, True): "both", (True, False): "parent", (False, True): "child", (False, False): "outside"}[(in_parent, in_child)]
+
+@pytest.mark.parametrize("radius, falloff", [(1.5, 1.0), (0.8, 2.5), (3.0, 0.3)])
+def test_capsule_blend_weights_match_per_vertex_rules(radius, falloff):
+    rng = np.random.default_rng(7)
+    parent_pos, child_pos, grandchild_pos = [0.0, 0.0, 0.0], [0.0, 3.0, 0.0], [0.5, 6.0, 0.0]
+    points = np.concatenate([rng.uniform(-3.0, 9.0, (3000, 3)) * [0.6, 1.0, 0.6],
+                             [child_pos, [0.0, 3.0004, 0.0]]])  # on the joint: total_dist <= 0.001
+    parent_w, child_w, valid = BlndWghtKernel.capsule_blend_weights(points, parent_pos, child_pos, grandchild_pos, radius, falloff)
+    for i, point in enumerate(points.tolist()):
+        expected = _capsule_reference(point, parent_pos, child_pos, grandchild_pos, radius, falloff)
+        assert valid[i] == (expected is not None)
+        if expected is not None: assert (parent_w[i], child_w[i]) == pytest.approx(expected)
+    assert not valid[-2:].any()
+    assert {"both", "parent", "child", "outside"} <= {_region(point, parent_pos, child_pos, grandchild_pos, radius) for point in points.tolist()}
+
+def _chain_triples(joint_positions):
+    return [tuple(joint_positions[i:i + 3]) for i in range(len(joint_positions) - 2)]
+
+@pytest.mark.parametrize("num_joints", [3, 4, 5])
+def test_capsule_chain_matches_single_triple_around_every_joint(num_joints):
+    rng = np.random.default_rng(num_joints)
+    joint_positions = [[0.3 * (i % 2), 2.0 * i, 0.0] for i in range(num_joints)]
+    segments = _chain_triples(joint_positions)
+    points = rng.uniform(-1.0, 1.0, (4000, 3)) * [1.2, 2.0 * num_joints, 1.2] + [0.0, num_joints - 1.0, 0.0]
+    # Split the chain in two so the thread pool merge is covered as well.
+    best, parent_w, child_w, _ = BlndWghtKernel.solve_capsule_chains(points, [segments[:1], segments[1:]], 1.5, 1.5)
+    middle = np.array([child_pos for _, child_pos, _ in segments])
+    nearest = np.linalg.norm(points[:, None] - middle[None], axis=2).argmin(axis=1)
+    for i, triple in enumerate(segments):
+        seg_parent_w, seg_child_w, valid = BlndWghtKernel.capsule_blend_weights(points, *triple, 1.5, 1.5)
+        around = (nearest == i) & valid
+        assert around.sum() > 50
+        assert (best[around] == i).all()
+        assert parent_w[around] == pytest.approx(seg_parent_w[around])
+        assert child_w[around] == pytest.approx(seg_child_w[around])
+        # Both sides of the joint are blended, not only the parent bone side.
+        assert ((seg_child_w[around] > 0.0) & (seg_child_w[around] < 1.0)).any()
+        assert ((seg_parent_w[around] > 0.0) & (seg_parent_w[around] < 1.0)).any()
+
+def test_collect_joint_chains_splits_at_branching_joints():
+    import fake_maya
+    import run_benchmarks
+    util = run_benchmarks.load_util()
+    names = ["root", "spine", "chest", "neck", "armL", "elbowL", "wristL", "legL", "kneeL", "ankleL"]
+    parents = {"spine": "root", "chest": "spine", "neck": "chest", "armL": "chest", "elbowL": "armL",
+               "wristL": "elbowL", "legL": "root", "kneeL": "legL", "ankleL": "kneeL"}
+    def path(name): return (path(parents[name]) if name in parents else "") + "|" + name
+    joints = [(path(name), [0.0, float(i), 0.0]) for i, name in enumerate(names)]
+    scene = fake_maya.FakeScene("body", [[0, 0, 0], [1, 0, 0], [0, 1, 0]], [3], [0, 1, 2], joints, np.zeros((3, len(joints))))
+    previous = fake_maya.get_scene(); fake_maya.set_scene(scene)
+    try:
+        chains = util._collect_joint_chains(["root"])
+        picked = util._collect_joint_chains(["elbowL", "chest", "kneeL"])
+    finally:
+        fake_maya.set_scene(previous)
+    short = lambda chains: sorted([tuple(jnt.split("|")[-1] for jnt in seg) for seg in chain] for chain in chains)
+    assert short(chains) == [[("chest", "armL", "elbowL"), ("armL", "elbowL", "wristL")],
+                             [("root", "legL", "kneeL"), ("legL", "kneeL", "ankleL")],
+                             [("root", "spine", "chest"), ("spine", "chest", "neck")]]
+    assert short(picked) == [[("armL", "elbowL", "wristL")], [("legL", "kneeL", "ankleL")], [("spine", "chest", "neck")]]
+
+@pytest.mark.parametrize("num_influences", [5, 40])
+def test_smooth_weight_block_matches_dense_jacobi(num_influences):
+    import fake_maya
+    from BlendWeightHelperTool import blendWeightHelperTopology as BlndWghtTopology
+    rng = np.random.default_rng(3)
+    scene = fake_maya.make_cylinder_scene(16 * 12, ring_size=16)
+    topology = BlndWghtTopology.MeshTopology(len(scene.points), scene.face_counts, scene.face_connects)
+    region, free_rows, indptr, indices = topology.smoothing_region(np.arange(16 * 3, 16 * 8))
+    # Three weights per row; with 40 influences the block is sparse, like a production rig.
+    block = np.zeros((len(region), num_influences))
+    for row in range(len(region)): block[row, rng.choice(num_influences, 3, replace=False)] = rng.random(3)
+    block[free_rows[:4]] = 0.0
+    expected = block.copy()
+    average = np.zeros((len(free_rows), len(region))); alpha = np.zeros((len(free_rows), 1))
+    for i in range(len(free_rows)):
+        neighbours = indices[indptr[i]:indptr[i + 1]]
+        if len(neighbours): average[i, neighbours] = 1.0 / len(neighbours); alpha[i] = 0.4
+    for _ in range(4): expected[free_rows] = (1.0 - alpha) * expected[free_rows] + alpha * (average @ expected)
+    expected[free_rows] = BlndWghtKernel.normalize_weight_block(expected[free_rows])
+    smoothed = BlndWghtKernel.smooth_weight_block(block, free_rows, indptr, indices, iterations=4, strength=0.4)
+    assert smoothed == pytest.approx(expected)
+
+@pytest.mark.parametrize("cell_factor", [0.5, 0.75, 1.0, 1.5, 2.0])
+def test_vertex_grid_query_segment_matches_brute_force(cell_factor):
+    rng = np.random.default_rng(11)
+    points = rng.normal(0.0, 3.0, (2000, 3)) * [1.0, 2.0, 0.5]
+    for _ in range(20):
+        radius = rng.uniform(0.3, 2.0)
+        grid = BlndWghtKernel.VertexGrid(points, radius * cell_factor)
+        seg_start = rng.uniform(-8.0, 8.0, 3)
+        # Long, short, zero-length and out-of-bounds segments.
+        for seg_end in (rng.uniform(-8.0, 8.0, 3), seg_start + rng.normal(0.0, 0.2, 3), seg_start, seg_start * 3.0):
+            expected = np.flatnonzero(BlndWghtKernel.segment_distances(points, seg_start, seg_end) < radius)
+            assert np.array_equal(grid.query_segment(seg_start, seg_end, radius), expected)
+    assert BlndWghtKernel.VertexGrid(points[:0], 1.0).query_segment([0, 0, 0], [1, 0, 0], 1.0).size == 0
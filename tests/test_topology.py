@@ -0,0 +1,36 @@
+import numpy as np
+
+import fake_maya
+from BlendWeightHelperTool import blendWeightHelperTopology as BlndWghtTopology
+
+RING = 16
+
+def _cylinder():
+    # Vertex row * RING + r sits on ring `row`, column `r`; rows 0 and -1 are the open borders.
+    scene = fake_maya.make_cylinder_scene(RING * 10, ring_size=RING)
+    return scene, BlndWghtTopology.MeshTopology(len(scene.points), scene.face_counts, scene.face_connects)
+
+def _ring(row):
+    return row * RING + np.arange(RING)
+
+def test_loop_through_ring_edge_is_the_whole_ring():
+    _, topology = _cylinder()
+    loop = topology.edge_loop_vertices([(_ring(4)[3], _ring(4)[4])])
+    assert np.array_equal(loop, _ring(4))
+
+def test_loop_through_rung_edge_runs_border_to_border():
+    scene, topology = _cylinder()
+    loop = topology.edge_loop_vertices([(_ring(4)[5], _ring(5)[5])])
+    assert np.array_equal(loop, np.arange(scene.rows) * RING + 5)
+
+def test_side_rings_step_out_on_both_sides():
+    _, topology = _cylinder()
+    sides = topology.side_rings(_ring(5), 2)
+    assert sides is not None
+    found = sorted([[sorted(ring.tolist()) for ring in side] for side in sides])
+    assert found == [[_ring(4).tolist(), _ring(3).tolist()], [_ring(6).tolist(), _ring(7).tolist()]]
+
+def test_side_rings_at_the_border_is_none():
+    _, topology = _cylinder()
+    assert topology.side_rings(_ring(0), 1) is None
+    assert topology.side_rings(_ring(1), 2) is None